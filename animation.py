@@ -1,13 +1,58 @@
-import math
-from manim import Tex
+import hashlib, importlib, math
+import numpy as np
+from manim import Tex, config
 from manim.animation.composition import AnimationGroup, LaggedStart
 from manim.animation.fading import FadeIn, FadeInFrom, FadeOut
 from manim.animation.transform import ApplyMethod, Transform
 from manim.constants import DOWN, LEFT, PI
 from manim.mobject.geometry import Arrow, Rectangle, Square
+from manim.mobject.types.vectorized_mobject import VGroup, VMobject
 from manim.scene.moving_camera_scene import MovingCameraScene
 from manim.utils.color import BLACK, BLUE, GREEN, RED, WHITE, YELLOW
 from manim.utils.rate_functions import smooth
+from dominoes import DIRECTIONS, DominoTable
+from shuffling import DIRECTION_VECTORS
+
+# The functions manim names partial movie files with, swapped out by SquareDanceAnimator.keyed on the module
+# that calls them: manim.utils.caching up to 0.3 (where waits are plays too), the cairo renderer after.
+HASH_MODULES = ["manim.utils.caching", "manim.renderer.cairo_renderer"]
+HASH_FUNCTIONS = ["get_hash_from_play_call", "get_hash_from_wait_call"]
+
+
+def _hash_functions():
+    # The first of HASH_MODULES with any of HASH_FUNCTIONS, and the names of those it has.
+    for module_name in HASH_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        names = [name for name in HASH_FUNCTIONS if hasattr(module, name)]
+        if names:
+            return module, names
+    return None, []
+
+HASH_MODULE, HASH_NAMES = _hash_functions()
+
+
+def _stable_repr(value):
+    # A repr of a setting that is the same between runs: classes and functions by name, lambdas by code.
+    if isinstance(value, (list, tuple)):
+        return repr([_stable_repr(v) for v in value])
+    if isinstance(value, dict):
+        return repr(sorted((repr(k), _stable_repr(v)) for k, v in value.items()))
+    if isinstance(value, type(_stable_repr.__code__)):
+        return repr((value.co_code, value.co_names, _stable_repr(value.co_consts)))
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    func = getattr(value, "__func__", value)
+    if callable(func) and hasattr(func, "__code__"):
+        if func.__name__ != "<lambda>":
+            return f"{func.__module__}.{func.__qualname__}"
+        closure = [cell.cell_contents for cell in func.__closure__ or ()]
+        return repr((_stable_repr(func.__code__), _stable_repr(closure)))
+    text = repr(value)
+    return type(value).__qualname__ if " at 0x" in text else text
+
 
 class SquareDanceAnimator(MovingCameraScene):
 
@@ -83,19 +128,130 @@ class SquareDanceAnimator(MovingCameraScene):
         ["CREATE"],
     ]
     SPEED = lambda self, i: 1
+    # Draw the dominoes as one VMobject per part of each arrow template (see _create_arrow), with the
+    # point arrays rebuilt in bulk each iteration, rather than one mobject per domino. Dominoes can't be
+    # animated individually then: an iteration's removals, moves and creations all show as its first
+    # step plays, and overlays are skipped. Suits settings like super_fast in video.py, and keeps the
+    # number of mobjects per frame constant as n grows. Steps still take as long as they would otherwise.
+    BATCH_ARROWS = False
+    # Iterations that would last less than a frame (typically late ones, once SPEED is large) aren't played:
+    # their end state is applied directly and a frame is rendered once a frame's worth of them has built up.
+    COALESCE_ITERATIONS = True
+    # Name partial movie files after the seed, engine version, iteration, step and a hash of STYLE_SETTINGS
+    # (see keyed), rather than letting manim hash every mobject in the scene for every play.
+    CACHE_KEYS = True
+    # Every setting that changes what is drawn or for how long. Add to it in subclasses with settings of their own.
+    STYLE_SETTINGS = [
+        "scale", "background_color", "TEXT_COLOR",
+        "OPEN_SQUARE_KWARGS", "SQUARE_CREATE_ANIM", "SQUARE_CREATE_RATE_FUNC", "SQUARE_LAG_RATIO", "SQUARE_CREATE_RUNTIME",
+        "ARROW_BG_KWARGS", "ARROW_DIR_COLOR", "TRANSFORM_FINAL", "ARROW_FINAL_BG_KWARGS", "ARROW_FINAL_DIR_COLOR",
+        "ARROW_FINAL_LAG_RATIO", "ARROW_FINAL_RUNTIME", "ARROW_CREATE_ANIM", "ARROW_LAG_RATIO", "ARROW_CREATE_RUNTIME",
+        "ARROW_OVERLAY_COLOUR", "ARROW_OVERLAY_STARTING_ALPHA",
+        "MOVEMENT_LAG_RATIO", "MOVEMENT_RUNTIME", "MOVEMENT_RATE_FUNC",
+        "DESTRUCTION_OVERLAY_COLOUR", "DESTRUCTION_OVERLAY_STARTING_ALPHA", "DESTRUCTION_ARROW_ANIM",
+        "DESTRUCTION_LAG_RATIO", "DESTRUCTION_RUNTIME",
+        "ITERATION_WAIT", "RESIZE", "RESIZE_TIME", "ANIMATION_STEPS", "SPEED", "BATCH_ARROWS", "COALESCE_ITERATIONS",
+    ]
+    # Only redraw what a play animates each frame, over an image of the rest of the scene (see get_moving_mobjects).
+    STATIC_LAYER = True
+    # A profiling.Profiler to record the time spent setting up and playing every iteration.
+    PROFILER = None
 
-    def from_obj(self, obj):
+    def from_obj(self, obj, start=0, final=True):
+        # Iterations before start are applied without being rendered, and final=False leaves out the
+        # final transform, so a run can be rendered in pieces (see render_parallel.py).
+        if self.CACHE_KEYS and HASH_MODULE is None:
+            raise RuntimeError(f"CACHE_KEYS needs one of {', '.join(HASH_FUNCTIONS)} in {' or '.join(HASH_MODULES)}; set it to False for this version of manim.")
         self.seed_text = self.create_seed_obj(obj)
         self.add(self.seed_text)
+        self.seed = obj["general_info"]["seed"]
+        # The seed alone doesn't fix the tiling, see AztecGenerator.engine_version.
+        self.engine_version = obj["general_info"].get("engine_version")
+        self.style_key = self.get_style_key()
         self.arrow_blocks = {}
+        self._arrow_templates = {}
+        self.arrow_batches = {}
+        self.dominoes = DominoTable()
+        # Every ring of open squares that has finished animating in, as one path.
+        self.open_squares = VMobject()
+        self.open_squares.match_style(Square(**self.OPEN_SQUARE_KWARGS), family=False)
+        self.add(self.open_squares)
         if self.RESIZE is True:
             self.camera_frame.set_height(self.scale * 3)
+        # generation_data is either a list or the stream from AztecGenerator.iter_generate.
+        frame_time = 1 / config["frame_rate"]
+        pending = 0
+        iteration = None
         for iteration_obj in obj["generation_data"]:
+            iteration = iteration_obj["iteration"]
+            if self.PROFILER is not None:
+                self.PROFILER.start("animator")
+            if iteration < start:
+                self.apply_iteration(iteration_obj)
+                self._lap("apply_iteration")
+                continue
+            duration = self.iteration_duration(iteration_obj)
+            if self.COALESCE_ITERATIONS and duration < frame_time:
+                self.apply_iteration(iteration_obj)
+                self._lap("apply_iteration")
+                pending += duration
+                if pending >= frame_time:
+                    self.keyed(("coalesced", iteration, pending), self.wait, pending)
+                    pending = 0
+                    self._lap("wait")
+                self._record(iteration)
+                continue
+            # Anything still pending shows in the first frame of this play.
+            pending = 0
             self.increment_animate(iteration_obj)
             if self.ITERATION_WAIT > 0:
-                self.wait(self.ITERATION_WAIT / self.SPEED(iteration_obj["iteration"]))
-        if self.TRANSFORM_FINAL:
-            self.transform_arrows()
+                self.keyed(("wait", iteration), self.wait, self.ITERATION_WAIT / self.SPEED(iteration))
+                self._lap("wait")
+            self._record(iteration)
+        if pending > 0:
+            self.keyed(("coalesced", iteration, pending), self.wait, frame_time)
+        if final and self.TRANSFORM_FINAL:
+            self.transform_arrows(iteration)
+
+    def _lap(self, phase):
+        if self.PROFILER is not None:
+            self.PROFILER.lap("animator", phase)
+
+    def _record(self, iteration):
+        if self.PROFILER is not None:
+            self.PROFILER.record("animator", iteration, mobjects=len(self.get_mobject_family_members()))
+
+    def get_moving_mobjects(self, *animations):
+        # manim treats every mobject from the first one with an updater (the seed text) or in the foreground
+        # (every arrow) onwards as moving, so each frame redraws the whole board. Unless the camera moves,
+        # only the animated mobjects are, and manim draws the rest once per play as its static image.
+        if not self.STATIC_LAYER:
+            return super().get_moving_mobjects(*animations)
+        animated = {member for animation in animations for member in animation.mobject.get_family()}
+        if self.camera_frame in animated:
+            return super().get_moving_mobjects(*animations)
+        return list(dict.fromkeys(mob for mob in self.mobjects + self.foreground_mobjects if mob in animated))
+
+    def get_style_key(self):
+        settings = {name: _stable_repr(getattr(self, name, None)) for name in self.STYLE_SETTINGS}
+        return hashlib.sha1(repr(sorted(settings.items())).encode()).hexdigest()
+
+    def keyed(self, parts, call, *args, **kwargs):
+        # Run a play or wait with its partial movie file named by parts. The seed, the engine version and
+        # the style settings fix the scene at any given iteration, so an unchanged run reuses every file
+        # without hashing mobjects. Generation data without an engine version is hashed by manim as usual.
+        if not self.CACHE_KEYS or self.engine_version is None:
+            return call(*args, **kwargs)
+        key = hashlib.sha1(repr((self.seed, self.engine_version, self.style_key, parts)).encode()).hexdigest()
+        # manim looks these up on their module at every call, so they are only replaced for this one.
+        originals = {name: getattr(HASH_MODULE, name) for name in HASH_NAMES}
+        for name in originals:
+            setattr(HASH_MODULE, name, lambda *_: key)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            for name, function in originals.items():
+                setattr(HASH_MODULE, name, function)
 
     def create_seed_obj(self, obj):
         seed = obj["general_info"]["seed"]
@@ -113,16 +269,29 @@ class SquareDanceAnimator(MovingCameraScene):
     def increment_animate(self, iteration_obj):
         # Generate the open squares.
         iteration = iteration_obj["iteration"]
-        expand_anim = self.generate_squares(iteration)
-        destroyed = iteration_obj["destroyed_blocks"]
-        destroyed_overlay, destroyed_anim = self.destroy_existing(destroyed)
-        moved = iteration_obj["moved_blocks"]
-        moved_anim = self.move_existing(moved)
-        created = iteration_obj["created_blocks"]
-        create_overlay, created_anim = self.create_arrows(created)
-        for animation in self.ANIMATION_STEPS:
+        squares, expand_anim = self.generate_squares(iteration)
+        self._lap("generate_squares")
+        expanded = False
+        batch_runtimes = {}
+        if self.BATCH_ARROWS:
+            self.update_batches(iteration_obj)
+            self._lap("update_batches")
+            destroyed_overlay, destroyed_anim, moved_anim, create_overlay, created_anim = None, None, None, None, None
+            # Nothing is animated for these steps, but they keep their run times so the pacing doesn't change.
+            batch_runtimes = self.event_runtimes(iteration_obj)
+        else:
+            destroyed = iteration_obj["destroyed_blocks"]
+            destroyed_overlay, destroyed_anim = self.destroy_existing(destroyed)
+            self._lap("destroy_existing")
+            moved = iteration_obj["moved_blocks"]
+            moved_anim = self.move_existing(moved)
+            self._lap("move_existing")
+            created = iteration_obj["created_blocks"]
+            create_overlay, created_anim = self.create_arrows(created)
+            self._lap("create_arrows")
+        for step, animation in enumerate(self.ANIMATION_STEPS):
             args = []
-            max_run_time = 0
+            max_run_time = max([batch_runtimes.get(step_name, 0) for step_name in animation] + [0])
             if "RESIZE" in animation and self.RESIZE:
                 max_run_time = max(max_run_time, self.RESIZE_TIME)
                 args.extend([
@@ -132,6 +301,7 @@ class SquareDanceAnimator(MovingCameraScene):
             if "EXPAND" in animation and expand_anim:
                 max_run_time = max(max_run_time, self.SQUARE_CREATE_RUNTIME)
                 args.append(expand_anim)
+                expanded = True
             if "REMOVE" in animation and destroyed_overlay:
                 self.add_foreground_mobjects(*destroyed_overlay)
             if "REMOVE" in animation and destroyed_anim:
@@ -146,30 +316,119 @@ class SquareDanceAnimator(MovingCameraScene):
                 max_run_time = max(max_run_time, self.ARROW_CREATE_RUNTIME)
                 args.append(created_anim)
             if len(args) > 0:
-                self.play(*args, run_time=max_run_time / self.SPEED(iteration_obj["iteration"]))
+                self.keyed(("play", iteration, step), self.play, *args, run_time=max_run_time / self.SPEED(iteration))
+                self._lap("play")
+            elif max_run_time > 0:
+                self.keyed(("play", iteration, step), self.wait, max_run_time / self.SPEED(iteration))
+                self._lap("play")
+        if expanded:
+            self.merge_squares(squares)
+            self._lap("merge_squares")
 
-    def generate_squares(self, iteration):
+    def iteration_duration(self, iteration_obj):
+        # How long increment_animate (and the wait after it) would take for this iteration.
+        runtimes = {}
+        if self.RESIZE:
+            runtimes["RESIZE"] = self.RESIZE_TIME
+        runtimes["EXPAND"] = self.SQUARE_CREATE_RUNTIME
+        runtimes.update(self.event_runtimes(iteration_obj))
+        total = self.ITERATION_WAIT
+        for animation in self.ANIMATION_STEPS:
+            total += max([runtimes.get(step, 0) for step in animation] + [0])
+        return total / self.SPEED(iteration_obj["iteration"])
+
+    def event_runtimes(self, iteration_obj):
+        # Run times of the REMOVE, MOVE and CREATE steps, for those with any dominoes to animate.
+        runtimes = {}
+        if len(iteration_obj["destroyed_blocks"]) > 0:
+            runtimes["REMOVE"] = self.DESTRUCTION_RUNTIME
+        if len(iteration_obj["moved_blocks"]) > 0:
+            runtimes["MOVE"] = self.MOVEMENT_RUNTIME
+        if len(iteration_obj["created_blocks"]) > 0:
+            runtimes["CREATE"] = self.ARROW_CREATE_RUNTIME
+        return runtimes
+
+    def apply_iteration(self, iteration_obj):
+        # The end state of increment_animate, without playing anything.
+        iteration = iteration_obj["iteration"]
+        if self.RESIZE:
+            self.camera_frame.set_height(self.scale * (2 * iteration + 5))
+        self.merge_squares(self.open_square_ring(iteration))
+        if self.BATCH_ARROWS:
+            self.update_batches(iteration_obj)
+            return
+        # Each remove or add rebuilds the scene's mobject lists, so all arrows go in one call of each.
+        old = [self.arrow_blocks.pop(id) for pair in iteration_obj["destroyed_blocks"] for id in pair]
+        if old:
+            self.remove(*old)
+        self.dominoes.apply(iteration_obj)
+        ids = [id for id, _ in iteration_obj["moved_blocks"]]
+        for id, centre in zip(ids, self._centres(ids)):
+            self.arrow_blocks[id].move_to(centre)
+        ids = [id for pair in iteration_obj["created_blocks"] for id, _, _ in pair]
+        new = []
+        for id, centre, code in zip(ids, self._centres(ids), self.dominoes.arrays()[2][ids]):
+            self.arrow_blocks[id] = self._create_arrow(centre, DIRECTIONS[code])
+            new.append(self.arrow_blocks[id])
+        if new:
+            self.add_foreground_mobjects(*new)
+
+    def merge_squares(self, squares):
+        # Once the new ring has animated in, fold it into the single open_squares path,
+        # so the background is always one mobject however many rings it has.
+        self.open_squares.append_points(np.concatenate([sq.points for sq in squares]))
+        self.remove(*squares)
+
+    def open_square_ring(self, iteration):
         squares = []
         for a in range(-iteration-1, iteration+1):
             b1 = iteration - math.floor(abs(a + 0.5))
             b2 = -iteration + math.floor(abs(a + 0.5)) - 1
             squares.append(self._generate_open_square([(a+0.5) * self.scale, (b1+0.5) * self.scale, 0]))
             squares.append(self._generate_open_square([(a+0.5) * self.scale, (b2+0.5) * self.scale, 0]))
+        return squares
+
+    def generate_squares(self, iteration):
+        squares = self.open_square_ring(iteration)
         if self.SQUARE_CREATE_ANIM is not None and self.SQUARE_CREATE_RUNTIME > 0:
-            return LaggedStart(*(self.SQUARE_CREATE_ANIM(v, rate_func=self.SQUARE_CREATE_RATE_FUNC) for v in squares), lag_ratio=self.SQUARE_LAG_RATIO)
+            return squares, LaggedStart(*(self.SQUARE_CREATE_ANIM(v, rate_func=self.SQUARE_CREATE_RATE_FUNC) for v in squares), lag_ratio=self.SQUARE_LAG_RATIO)
         else:
             # Instantly show.
-            return LaggedStart(*(FadeIn(v, rate_func=lambda t: 1) for v in squares), lag_ratio=self.SQUARE_LAG_RATIO)
+            return squares, LaggedStart(*(FadeIn(v, rate_func=lambda t: 1) for v in squares), lag_ratio=self.SQUARE_LAG_RATIO)
 
     def _generate_open_square(self, position):
         sq = Square(side_length=self.scale, **self.OPEN_SQUARE_KWARGS)
         sq.move_to(position)
         return sq
 
+    # self.dominoes, the same table the python engine steps, gives each domino's anchor cell and
+    # direction, so positions and overlays come from there rather than from mobject points.
+    def _centres(self, ids):
+        # Scene positions of the centres of the dominoes in ids (of any shape).
+        x, y, direction, _ = self.dominoes.arrays()
+        ids = np.asarray(ids, dtype=int)
+        # Up and down dominoes lie along a row, left and right ones along a column.
+        along_row = DIRECTION_VECTORS[direction[ids], 0] != 0
+        centres = np.zeros(ids.shape + (3,))
+        centres[..., 0] = (x[ids] + np.where(along_row, 0.5, 1)) * self.scale
+        centres[..., 1] = (y[ids] + np.where(along_row, 1, 0.5)) * self.scale
+        return centres
+
+    def _overlay_centres(self, pairs):
+        # Centre of the 2x2 square covering each pair of dominoes, a cell in from its lowest anchor.
+        x, y, _, _ = self.dominoes.arrays()
+        centres = np.zeros((len(pairs), 3))
+        centres[:, 0] = (x[pairs].min(axis=1) + 1) * self.scale
+        centres[:, 1] = (y[pairs].min(axis=1) + 1) * self.scale
+        return centres
+
     def destroy_existing(self, destroyed_blocks):
         all_anims = []
         overlay_objs = []
-        for id1, id2 in destroyed_blocks:
+        pairs = np.array(list(destroyed_blocks), dtype=int).reshape(-1, 2)
+        centres = self._overlay_centres(pairs)
+        self.dominoes.destroy(destroyed_blocks)
+        for (id1, id2), centre in zip(destroyed_blocks, centres):
             # Generate a square containing both arrow blocks, and fade colour.
             if self.DESTRUCTION_RUNTIME > 0:
                 anims = []
@@ -181,11 +440,9 @@ class SquareDanceAnimator(MovingCameraScene):
                     anims.append(FadeOut(self.arrow_blocks[id1], rate_func=lambda t: 1))
                     anims.append(FadeOut(self.arrow_blocks[id2], rate_func=lambda t: 1))
                 if self.DESTRUCTION_OVERLAY_COLOUR is not None:
-                    top = max(self.arrow_blocks[id1].get_top()[1], self.arrow_blocks[id2].get_top()[1])
-                    right = max(self.arrow_blocks[id1].get_right()[0], self.arrow_blocks[id2].get_right()[0])
                     fade_square = Square(side_length=self.scale * 2, color=self.DESTRUCTION_OVERLAY_COLOUR)
                     fade_square.set_opacity(self.DESTRUCTION_OVERLAY_STARTING_ALPHA)
-                    fade_square.move_to([right - self.scale, top - self.scale, 0])
+                    fade_square.move_to(centre)
                     overlay_objs.append(fade_square)
                     anims.append(FadeOut(fade_square))
                 all_anims.append(AnimationGroup(*anims))
@@ -199,10 +456,9 @@ class SquareDanceAnimator(MovingCameraScene):
 
     def move_existing(self, moved_blocks):
         anims = []
-        for id, (dx, dy) in moved_blocks:
-            new_pos = self.arrow_blocks[id].get_center()
-            new_pos[0] = new_pos[0] + dx * self.scale
-            new_pos[1] = new_pos[1] + dy * self.scale
+        self.dominoes.move(moved_blocks)
+        targets = self._centres([id for id, _ in moved_blocks])
+        for (id, _), new_pos in zip(moved_blocks, targets):
             if self.MOVEMENT_RUNTIME > 0:
                 anims.append(ApplyMethod(self.arrow_blocks[id].move_to, new_pos, rate_func=self.MOVEMENT_RATE_FUNC))
             else:
@@ -213,22 +469,18 @@ class SquareDanceAnimator(MovingCameraScene):
     def create_arrows(self, created):
         all_anims = []
         overlay_objs = []
-        for (id1, (p11, p12), (d1x, d1y)), (id2, (p21, p22), (d2x, d2y)) in created:
-            self.arrow_blocks[id1] = self._create_arrow(
-                [((p11[0] + p12[0])/2 + 0.5) * self.scale, ((p11[1] + p12[1])/2 + 0.5) * self.scale, 0],
-                [d1x, d1y],
-            )
-            self.arrow_blocks[id2] = self._create_arrow(
-                [((p21[0] + p22[0])/2 + 0.5) * self.scale, ((p21[1] + p22[1])/2 + 0.5) * self.scale, 0],
-                [d2x, d2y],
-            )
+        self.dominoes.create(created)
+        pairs = np.array([[first[0], second[0]] for first, second in created], dtype=int).reshape(-1, 2)
+        positions = self._centres(pairs)
+        centres = self._overlay_centres(pairs)
+        for ((id1, _, (d1x, d1y)), (id2, _, (d2x, d2y))), (pos1, pos2), centre in zip(created, positions, centres):
+            self.arrow_blocks[id1] = self._create_arrow(pos1, [d1x, d1y])
+            self.arrow_blocks[id2] = self._create_arrow(pos2, [d2x, d2y])
             overlay_objs.extend([self.arrow_blocks[id1], self.arrow_blocks[id2]])
             if self.ARROW_OVERLAY_COLOUR is not None:
-                top = max(self.arrow_blocks[id1].get_top()[1], self.arrow_blocks[id2].get_top()[1])
-                right = max(self.arrow_blocks[id1].get_right()[0], self.arrow_blocks[id2].get_right()[0])
                 fade_square = Square(side_length=self.scale * 2, color=self.ARROW_OVERLAY_COLOUR)
                 fade_square.set_opacity(self.ARROW_OVERLAY_STARTING_ALPHA)
-                fade_square.move_to([right - self.scale, top - self.scale, 0])
+                fade_square.move_to(centre)
                 overlay_objs.append(fade_square)
             if self.ARROW_CREATE_RUNTIME > 0:
                 anims = []
@@ -250,7 +502,51 @@ class SquareDanceAnimator(MovingCameraScene):
             return overlay_objs, LaggedStart(*all_anims, lag_ratio=self.ARROW_LAG_RATIO)
         return overlay_objs, None
 
+    def update_batches(self, iteration_obj):
+        # BATCH_ARROWS: apply an iteration to the domino table, then rebuild the batches.
+        self.dominoes.apply(iteration_obj)
+        self.rebuild_batches()
+
+    def rebuild_batches(self, final=False):
+        # With BATCH_ARROWS no domino has its own mobject; the domino table is the board.
+        positions = {}
+        _, _, direction, alive = self.dominoes.arrays()
+        live = np.nonzero(alive)[0]
+        centres, codes = self._centres(live), direction[live]
+        for code, vector in enumerate(DIRECTIONS):
+            at = centres[codes == code]
+            if len(at) > 0:
+                positions[self._arrow_template(vector, final)] = at
+        for key in set(self.arrow_batches) | set(positions):
+            template = self._arrow_templates[key]
+            members = template.family_members_with_points()
+            if key not in self.arrow_batches:
+                self.arrow_batches[key] = []
+                for member in members:
+                    part = VMobject()
+                    part.match_style(member, family=False)
+                    self.arrow_batches[key].append(part)
+                self.add_foreground_mobjects(*self.arrow_batches[key])
+            offsets = positions.get(key, np.zeros((0, 3))).reshape(-1, 1, 3)
+            for part, member in zip(self.arrow_batches[key], members):
+                part.set_points((member.points[None] + offsets).reshape(-1, 3))
+
+    def _arrow_template(self, direction, final=False):
+        # Arrows are copies of a template built at the origin, keyed by everything that styles them.
+        # Changing the style settings between sections therefore never reuses a stale template.
+        kwargs = self.ARROW_FINAL_BG_KWARGS(*direction) if final else self.ARROW_BG_KWARGS(*direction)
+        col = self.ARROW_FINAL_DIR_COLOR if final else self.ARROW_DIR_COLOR
+        key = (tuple(direction), final, self.scale, col, repr(sorted(kwargs.items())))
+        if key not in self._arrow_templates:
+            self._arrow_templates[key] = self._build_arrow(direction, kwargs, col)
+        return key
+
     def _create_arrow(self, pos, direction, final=False):
+        rect = self._arrow_templates[self._arrow_template(direction, final)].copy()
+        rect.shift(pos)
+        return rect
+
+    def _build_arrow(self, direction, kwargs, col):
         # First the bg rect.
         if direction[0] == 0:
             width, height = 2, 1
@@ -259,15 +555,9 @@ class SquareDanceAnimator(MovingCameraScene):
         rect = Rectangle(
             width=width*self.scale, 
             height=height*self.scale, 
-            **(
-                self.ARROW_FINAL_BG_KWARGS(*direction)
-                if final else
-                self.ARROW_BG_KWARGS(*direction)
-            )
+            **kwargs
         )
-        rect.move_to(pos)
         rect.direction = direction
-        col = self.ARROW_FINAL_DIR_COLOR if final else self.ARROW_DIR_COLOR
         if col is not None:
             arrow = Arrow(color=col)
             arrow.scale(self.scale * 0.5)
@@ -281,18 +571,29 @@ class SquareDanceAnimator(MovingCameraScene):
                 arrow.rotate(3*PI/2)
             else:
                 raise ValueError(f"Unknown direction {direction}")
-            arrow.move_to(pos)
+            arrow.move_to(rect.get_center())
             rect.add(arrow)
         return rect
 
-    def transform_arrows(self):
+    def transform_arrows(self, iteration=None):
+        if self.BATCH_ARROWS:
+            old = VGroup(*(part for parts in self.arrow_batches.values() for part in parts))
+            self.arrow_batches = {}
+            self.rebuild_batches(final=True)
+            new = VGroup(*(part for parts in self.arrow_batches.values() for part in parts))
+            self.keyed(("final", iteration), self.play, FadeOut(old), FadeIn(new), run_time=self.ARROW_FINAL_RUNTIME)
+            return
         anims = []
-        for id in self.arrow_blocks:
-            new_arrow = self._create_arrow(self.arrow_blocks[id].get_center(), self.arrow_blocks[id].direction, final=True)
+        ids = list(self.arrow_blocks)
+        for id, centre, code in zip(ids, self._centres(ids), self.dominoes.arrays()[2][ids]):
+            new_arrow = self._create_arrow(centre, DIRECTIONS[code], final=True)
             anims.append(Transform(self.arrow_blocks[id], new_arrow))
-        self.play(LaggedStart(*anims, lag_ratio=self.ARROW_FINAL_LAG_RATIO), run_time=self.ARROW_FINAL_RUNTIME)
+        self.keyed(("final", iteration), self.play, LaggedStart(*anims, lag_ratio=self.ARROW_FINAL_LAG_RATIO), run_time=self.ARROW_FINAL_RUNTIME)
 
     def reset(self):
         self.remove(*self.mobjects)
         self.remove_foreground_mobjects(*self.foreground_mobjects)
         self.arrow_blocks = {}
+        self._arrow_templates = {}
+        self.arrow_batches = {}
+        self.dominoes = DominoTable()
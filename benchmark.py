@@ -0,0 +1,203 @@
+"""
+Benchmarks for generation and animation, runnable headless.
+
+    python benchmark.py --save baseline.json     # record a baseline
+    python benchmark.py --compare baseline.json  # report against it, exit 1 on a regression
+
+Cases:
+- generate/<engine>/n=<n>: AztecGenerator.generate, keeping obj, so the peak includes the stored generation data.
+- iter_generate/<engine>/n=<n>: consuming AztecGenerator.iter_generate (events are built, but not kept).
+- tiling/n=<n>: AztecGenerator.generate_tiling.
+- eventlog/n=<n>: AztecGenerator.write_event_log, also reporting the file size.
+- animator/<section>: constructing each VideoAnimation section with manim's skip_animations, so nothing
+  is rendered or written. Skipped when manim isn't installed.
+Every case runs over the same fixed seeds, or just the first from n = LARGE_N. Peak memory comes from a first
+run under tracemalloc, time is the best of --repeat untraced runs after it (a single one when the traced run
+took over LONG_RUN seconds). The default sweep takes about five minutes; --large adds the sizes that take
+minutes each, up to n = 1000 for the numpy engine and n = 2000 for generate_tiling.
+"""
+import argparse, json, os, sys, tempfile, time, tracemalloc
+from generation import AztecGenerator
+# Imported up front so the numpy engine's first case doesn't count the import in its peak memory.
+import eventlog, shuffling
+
+SEEDS = ["BENCH0", "BENCH1", "BENCH2"]
+SIZES = [10, 20, 50, 100, 200, 500]
+LARGE_SIZES = [1000, 2000]
+# The largest n of each kind of case, without and with --large. The event log grows with n^3, so the
+# event based cases stop earlier than the tiling, and those storing it (about 0.5 GiB at n = 200) earlier still.
+MAX_N = {
+    "generate/python": 50, "generate/numpy": 100, "iter_generate/python": 100, "iter_generate/numpy": 200,
+    "eventlog": 100, "tiling": 500,
+}
+LARGE_MAX_N = {
+    "generate/python": 100, "generate/numpy": 200, "iter_generate/python": 200, "iter_generate/numpy": 1000,
+    "eventlog": 200, "tiling": 2000,
+}
+LARGE_N = 200
+LONG_RUN = 1
+# A case only counts as a regression when it is worse by over the tolerance and by over these amounts,
+# so the jitter of cases that take milliseconds isn't reported.
+MIN_CHANGE = {"time": 0.05, "peak_memory": 2**20, "bytes": 0}
+SECTIONS = ["slow", "fast", "super_fast"]
+
+
+def measure(run, repeat):
+    # The traced run goes first, so caches are warm for the timed ones. Whatever run returns is kept as "bytes".
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = run()
+    traced = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = []
+    for _ in range(repeat if traced < LONG_RUN else 1):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    result = {"time": min(times), "peak_memory": peak}
+    if size is not None:
+        result["bytes"] = size
+    return result
+
+
+def seeds(n):
+    return SEEDS[:1] if n >= LARGE_N else SEEDS
+
+
+def generate_case(engine, n):
+    def run():
+        objs = []
+        for seed in seeds(n):
+            a = AztecGenerator()
+            a.ENGINE = engine
+            a.generate(seed=seed, n=n)
+            objs.append(a.obj)
+    return run
+
+
+def iter_generate_case(engine, n):
+    def run():
+        for seed in seeds(n):
+            a = AztecGenerator()
+            a.ENGINE = engine
+            for _ in a.iter_generate(seed=seed, n=n)["generation_data"]:
+                pass
+    return run
+
+
+def tiling_case(n):
+    def run():
+        for seed in seeds(n):
+            AztecGenerator().generate_tiling(seed=seed, n=n)
+    return run
+
+
+def eventlog_case(n, directory):
+    def run():
+        total = 0
+        for seed in seeds(n):
+            path = os.path.join(directory, f"{seed}.bin")
+            a = AztecGenerator()
+            a.ENGINE = "numpy"
+            a.write_event_log(path, seed, n)
+            total += os.path.getsize(path)
+        return total
+    return run
+
+
+def animator_case(section):
+    def run():
+        from manim import tempconfig
+        from video import VideoAnimation
+        with tempconfig({"skip_animations": True, "write_to_movie": False, "save_last_frame": False, "disable_caching": True}):
+            for seed in SEEDS:
+                scene = VideoAnimation()
+                scene.SEED = seed
+                scene.SECTIONS = [section]
+                scene.GENERATION_CACHE = None
+                scene.render()
+    return run
+
+
+def cases(directory, sizes=SIZES, large=False, animator=True):
+    # Every case to run, by name.
+    max_n = LARGE_MAX_N if large else MAX_N
+    result = {}
+    for kind, case in (("generate", generate_case), ("iter_generate", iter_generate_case)):
+        for engine in ("python", "numpy"):
+            for n in sizes:
+                if n <= max_n[f"{kind}/{engine}"]:
+                    result[f"{kind}/{engine}/n={n}"] = case(engine, n)
+    for n in sizes:
+        if n <= max_n["tiling"]:
+            result[f"tiling/n={n}"] = tiling_case(n)
+    for n in sizes:
+        if n <= max_n["eventlog"]:
+            result[f"eventlog/n={n}"] = eventlog_case(n, directory)
+    if animator:
+        try:
+            import manim
+        except ImportError:
+            print("manim is not installed, skipping the animator benchmarks.", file=sys.stderr)
+        else:
+            for section in SECTIONS:
+                result[f"animator/{section}"] = animator_case(section)
+    return result
+
+
+def is_regression(result, before, tolerance):
+    return any(
+        result[key] > before[key] * (1 + tolerance) and result[key] - before[key] > MIN_CHANGE.get(key, 0)
+        for key in result if before.get(key)
+    )
+
+
+def compare(results, baseline, tolerance):
+    # Print each case against the baseline, returning the names of the regressions.
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        line = f"{name:28} {result['time']:10.4f}s {result['peak_memory'] / 2**20:10.2f}MiB"
+        if "bytes" in result:
+            line += f" {result['bytes']:12d}B"
+        if before is not None:
+            ratios = {key: result[key] / before[key] for key in result if before.get(key)}
+            line += "  " + " ".join(f"{key} x{ratio:.2f}" for key, ratio in ratios.items())
+            if is_regression(result, before, tolerance):
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generation and animation.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="sizes to run, by default all that take seconds")
+    parser.add_argument("--large", action="store_true", help="also run the sizes that take minutes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-animator", action="store_true")
+    parser.add_argument("--save", help="write the results as a baseline")
+    parser.add_argument("--compare", help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a case is a regression")
+    args = parser.parse_args()
+    sizes = args.sizes or SIZES + LARGE_SIZES * args.large
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    with tempfile.TemporaryDirectory() as directory:
+        runs = cases(directory, sizes, args.large, not args.no_animator)
+        results = {}
+        for name, run in runs.items():
+            results[name] = measure(run, args.repeat)
+            # One slow run is often just noise, so a case only counts as a regression if it is still slow when measured again.
+            if name in baseline and is_regression(results[name], baseline[name], args.tolerance):
+                again = measure(run, 2 * args.repeat)
+                results[name] = {key: min(value, again[key]) for key, value in results[name].items()}
+    regressions = compare(results, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        sys.exit(1)
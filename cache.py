@@ -0,0 +1,53 @@
+import hashlib, os, pickle, tempfile
+
+
+class GenerationCache:
+    """
+    On disk cache of AztecGenerator runs, keyed by (seed, engine version).
+    Each entry holds the generation data of the longest run so far, plus a snapshot of the generator
+    after its last iteration, so a longer run of the same seed extends it rather than starting over.
+    Several processes may share a directory (see render_parallel.py): saves never clash, and an entry
+    that can't be read counts as missing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, seed, version):
+        key = hashlib.sha1(repr((seed, version)).encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def load(self, seed, version):
+        try:
+            with open(self._path(seed, version), "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or otherwise unreadable, for instance written by an older version of this class.
+            return None
+        if not isinstance(entry, dict) or entry.get("seed") != seed or entry.get("version") != version:
+            return None
+        return entry
+
+    def save(self, seed, version, generation_data, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(seed, version)
+        # Another process may have cached a longer run in the meantime.
+        entry = self.load(seed, version)
+        if entry is not None and len(entry["generation_data"]) >= len(generation_data):
+            return
+        # Write to a file of our own then rename, so an interrupted or concurrent save never leaves a broken entry.
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({
+                    "seed": seed,
+                    "version": version,
+                    "generation_data": generation_data,
+                    "snapshot": snapshot,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
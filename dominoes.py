@@ -0,0 +1,87 @@
+from array import array
+
+# Direction codes, used by every engine and file format, and board cells that hold no domino. Remember x is down, y is right.
+UP, DOWN, LEFT, RIGHT = range(4)
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+OPPOSITE = [DOWN, UP, RIGHT, LEFT]
+EMPTY = -1
+OUTSIDE = -2
+
+
+class DominoTable:
+    """
+    Every domino of a run indexed by id, as parallel arrays: the anchor cell (the top left of its two
+    cells, relative to the centre of the board like created_blocks), the direction code, and whether
+    it is still on the board. Up and down dominoes lie along a row, left and right ones along a column.
+    The python engine keeps one next to a board of ids, and the animators build one from events.
+    """
+
+    __slots__ = ("x", "y", "direction", "alive")
+
+    def __init__(self):
+        self.x = array("i")
+        self.y = array("i")
+        self.direction = array("b")
+        self.alive = array("b")
+
+    def __len__(self):
+        return len(self.x)
+
+    def add(self, x, y, direction):
+        # Append a domino, returning its id.
+        self.x.append(x)
+        self.y.append(y)
+        self.direction.append(direction)
+        self.alive.append(1)
+        return len(self.x) - 1
+
+    def cells(self, id):
+        x, y = self.x[id], self.y[id]
+        if self.direction[id] <= DOWN:
+            return (x, y), (x, y + 1)
+        return (x, y), (x + 1, y)
+
+    def resize(self, size):
+        # Make room for ids below size, for events that arrive with ids already assigned.
+        extra = size - len(self.x)
+        if extra > 0:
+            for column in (self.x, self.y, self.direction, self.alive):
+                column.frombytes(bytes(column.itemsize * extra))
+
+    def destroy(self, destroyed_blocks):
+        for id1, id2 in destroyed_blocks:
+            self.alive[id1] = 0
+            self.alive[id2] = 0
+
+    def move(self, moved_blocks):
+        for id, (dx, dy) in moved_blocks:
+            self.x[id] += dx
+            self.y[id] += dy
+
+    def create(self, created_blocks):
+        for pair in created_blocks:
+            for id, (p1, p2), direction in pair:
+                if id >= len(self.x):
+                    self.resize(id + 1)
+                self.x[id] = min(p1[0], p2[0])
+                self.y[id] = min(p1[1], p2[1])
+                self.direction[id] = DIRECTION_CODES[tuple(direction)]
+                self.alive[id] = 1
+
+    def apply(self, iteration_obj):
+        # Bring the table from before an iteration of generation data to after it.
+        self.destroy(iteration_obj["destroyed_blocks"])
+        self.move(iteration_obj["moved_blocks"])
+        self.create(iteration_obj["created_blocks"])
+
+    def arrays(self):
+        # NumPy views of x, y, direction and alive, for work on every domino at once.
+        # Drop them before the table grows again: an array can't be resized while it is viewed.
+        import numpy as np
+        return (
+            np.frombuffer(self.x, dtype=np.int32),
+            np.frombuffer(self.y, dtype=np.int32),
+            np.frombuffer(self.direction, dtype=np.int8),
+            np.frombuffer(self.alive, dtype=np.int8),
+        )
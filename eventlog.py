@@ -0,0 +1,175 @@
+"""
+Compact binary format for generation data, an alternative to the nested lists in AztecGenerator.obj.
+
+Layout (little endian):
+    magic b"AZTL", format version (uint32), header length (uint32), JSON header with general_info and size,
+    zero padding to a multiple of 8 bytes.
+    One chunk per iteration, of int32 columns:
+        destroyed: first ids, second ids
+        moved: ids, direction codes
+        created (one entry per domino, pairs kept together): ids, x, y, direction codes
+    The offset table: int64 rows of (chunk offset in bytes, destroyed count, moved count, created count).
+    Trailer: offset table position and iteration count (int64 each), then b"AZTE".
+Direction codes are those of dominoes.py. Created dominoes store their top/left cell, the other cell
+being below it for left/right dominoes and to its right for up/down dominoes.
+"""
+import json, struct, sys
+from array import array
+from dominoes import DIRECTION_CODES, DIRECTIONS, DOWN
+
+MAGIC = b"AZTL"
+END_MAGIC = b"AZTE"
+FORMAT_VERSION = 1
+TRAILER = struct.Struct("<qq4s")
+
+
+def _little_endian(typecode, values):
+    # The bytes of values as a little endian array. Writing doesn't need numpy, so it starts quickly.
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+class EventLogWriter:
+    # Streams iterations to path as they are written. Use as a context manager, or call close.
+
+    def __init__(self, path, general_info, size):
+        self.f = open(path, "wb")
+        header = json.dumps({"general_info": general_info, "size": size}).encode()
+        self.f.write(MAGIC + struct.pack("<II", FORMAT_VERSION, len(header)) + header)
+        self.f.write(b"\0" * (-self.f.tell() % 8))
+        self.table = []
+
+    def write(self, iteration_obj):
+        destroyed = list(iteration_obj["destroyed_blocks"])
+        moved = iteration_obj["moved_blocks"]
+        created = [domino for pair in iteration_obj["created_blocks"] for domino in pair]
+        columns = [
+            [first for first, _ in destroyed],
+            [second for _, second in destroyed],
+            [id for id, _ in moved],
+            [DIRECTION_CODES[tuple(d)] for _, d in moved],
+            [id for id, _, _ in created],
+            [cells[0][0] for _, cells, _ in created],
+            [cells[0][1] for _, cells, _ in created],
+            [DIRECTION_CODES[tuple(d)] for _, _, d in created],
+        ]
+        self.table.append((self.f.tell(), len(destroyed), len(moved), len(created)))
+        for column in columns:
+            self.f.write(_little_endian("i", column))
+
+    def close(self):
+        table_offset = self.f.tell()
+        self.f.write(_little_endian("q", [value for row in self.table for value in row]))
+        self.f.write(TRAILER.pack(table_offset, len(self.table), END_MAGIC))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave out the offset table and trailer, so EventLogReader rejects the unfinished file.
+            self.f.close()
+
+
+class DestroyedBlocks:
+    # Iterates as [first id, second id], like generation data.
+
+    def __init__(self, first, second):
+        self.first, self.second = first, second
+
+    def __len__(self):
+        return len(self.first)
+
+    def __iter__(self):
+        return ([a, b] for a, b in zip(self.first.tolist(), self.second.tolist()))
+
+
+class MovedBlocks:
+    # Iterates as [id, [dx, dy]], like generation data.
+
+    def __init__(self, ids, codes):
+        self.ids, self.codes = ids, codes
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        directions = [list(d) for d in DIRECTIONS]
+        return ([id, directions[code]] for id, code in zip(self.ids.tolist(), self.codes.tolist()))
+
+
+class CreatedBlocks:
+    # Iterates as pairs of [id, [cell, cell], (dx, dy)], like generation data.
+
+    def __init__(self, ids, xs, ys, codes):
+        self.ids, self.xs, self.ys, self.codes = ids, xs, ys, codes
+
+    def __len__(self):
+        return len(self.ids) // 2
+
+    def __iter__(self):
+        dominoes = []
+        for id, x, y, code in zip(self.ids.tolist(), self.xs.tolist(), self.ys.tolist(), self.codes.tolist()):
+            other = [x, y + 1] if code <= DOWN else [x + 1, y]
+            dominoes.append([id, [[x, y], other], DIRECTIONS[code]])
+            if len(dominoes) == 2:
+                yield dominoes
+                dominoes = []
+
+
+class EventLogReader:
+    """
+    Memory maps a file written by EventLogWriter. Indexing with "general_info", "size" and
+    "generation_data" mirrors AztecGenerator.obj, so SquareDanceAnimator.from_obj accepts a reader.
+    Each iteration's blocks iterate like generation data, and expose their int32 columns
+    (zero copy views of the file) as attributes.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, header_length = struct.unpack("<4sII", self.data[:12].tobytes())
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not an event log of format version {FORMAT_VERSION}")
+        self.header = json.loads(self.data[12:12 + header_length].tobytes())
+        table_offset, count, end = TRAILER.unpack(self.data[-TRAILER.size:].tobytes())
+        if end != END_MAGIC:
+            raise ValueError(f"{path} was not closed properly")
+        self.table = np.frombuffer(self.data, dtype="<i8", count=4 * count, offset=table_offset).reshape(-1, 4)
+
+    def __getitem__(self, key):
+        if key == "generation_data":
+            return self
+        if key in ("general_info", "size"):
+            return self.header[key]
+        raise KeyError(key)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return (self.iteration(i) for i in range(len(self)))
+
+    def columns(self, i):
+        # The eight int32 columns of iteration i, in the order listed in the module docstring.
+        import numpy as np
+        offset, destroyed, moved, created = self.table[i].tolist()
+        columns = []
+        for count in [destroyed] * 2 + [moved] * 2 + [created] * 4:
+            columns.append(np.frombuffer(self.data, dtype="<i4", count=count, offset=offset))
+            offset += 4 * count
+        return columns
+
+    def iteration(self, i):
+        columns = self.columns(i)
+        return {
+            "iteration": i,
+            "created_blocks": CreatedBlocks(*columns[4:]),
+            "destroyed_blocks": DestroyedBlocks(*columns[:2]),
+            "moved_blocks": MovedBlocks(*columns[2:4]),
+        }
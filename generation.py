@@ -1,12 +1,103 @@
-import math, random
+import copy, math, random
+from dominoes import DIRECTIONS, DOWN, EMPTY, LEFT, OPPOSITE, OUTSIDE, RIGHT, UP, DominoTable
+from rng import CounterRNG, SequentialRNG
+
+# Each edge of the diamond, with the direction code of the dominoes frozen against it, whether its runs
+# go along rows (else columns) and which way they run.
+FROZEN_EDGES = [("left", LEFT, True, 1), ("right", RIGHT, True, -1), ("top", UP, False, 1), ("bottom", DOWN, False, -1)]
+
+
+def _diamond_line(size, a):
+    # First index and length of row (or column) a of a size x size board inside the diamond.
+    half = size // 2
+    w = half - math.floor(abs(a + 0.5 - half))
+    return half - w, 2 * w
+
+
+def frozen_boundary(runs):
+    """
+    Points on the edge of the frozen regions for frozen runs (see AztecGenerator.TRACK_FROZEN), as (x, y)
+    relative to the centre of the board in cells, like created_blocks. Lines that don't reach a region,
+    or are frozen all the way across, are left out. For large n these points approach the arctic circle, of radius n / sqrt(2).
+    """
+    size = len(runs["left"])
+    half = size // 2
+    points = []
+    for edge, _, row, step in FROZEN_EDGES:
+        for a, run in enumerate(runs[edge]):
+            lo, length = _diamond_line(size, a)
+            if run == 0 or run == length:
+                continue
+            across = (lo + run if step == 1 else lo + length - run) - half
+            points.append((a - half + 0.5, across) if row else (across, a - half + 0.5))
+    return points
 
 class AztecGenerator:
 
     seed = None
     STRING_SIZE = 6
     current_id = 0
+    # "python" steps over nested lists, "numpy" uses the whole-array engine in shuffling.py.
+    # Both produce identical generation data for a given seed.
+    ENGINE = "python"
+    # Rows per band when generating only the final tiling.
+    BAND_ROWS = 256
+    # Draw coin flips one after another from random.Random(seed) in scan order, as before CounterRNG.
+    # Needed to reproduce older seeds, but prevents splitting a step across processes.
+    SEQUENTIAL_RNG = False
+    # Bump whenever the generation data produced for a seed (or the snapshot format) changes, so cached runs are dropped.
+    GENERATION_VERSION = 3
+    # A cache.GenerationCache to reuse and extend earlier runs of the same seed, see iter_generate.
+    CACHE = None
+    # A profiling.Profiler to record the time spent in each phase of every step.
+    PROFILER = None
+    # Keep self.frozen up to date every step: for each row, how many cells from its left end point left,
+    # and from its right end point right ("left" and "right"), and likewise for each column with up and
+    # down ("top" and "bottom"). Iterations then also carry a copy as "frozen_runs". See frozen_boundary.
+    TRACK_FROZEN = False
 
     def generate(self, seed=None, n=10):
+        self.iter_generate(seed, n)
+        self.obj["generation_data"] = list(self.obj["generation_data"])
+
+    def iter_generate(self, seed=None, n=10, snapshot=None):
+        # Same as generate, but self.obj["generation_data"] is a generator yielding one iteration at a time.
+        # Only the live board is kept, so iteration 0 can be animated before iteration n is computed.
+        # With a CACHE, cached iterations are replayed first and the board is only restored and
+        # stepped if more iterations are needed than were cached.
+        # Given a snapshot, generation continues from it instead, with its seed, engine and RNG mode,
+        # yielding only the iterations after it. CACHE isn't used then.
+        if snapshot is not None:
+            seed = snapshot["seed"]
+            self.ENGINE = snapshot["engine"]
+            self.SEQUENTIAL_RNG = snapshot["sequential_rng"]
+        self._start(seed, n)
+        # Generate.
+        self.iteration = 0
+        self.frozen = None
+        if self.ENGINE == "numpy":
+            from shuffling import NumpyBoard
+            self.board = NumpyBoard()
+        else:
+            self.area = []
+            self.dominoes = DominoTable()
+        if snapshot is not None:
+            self.restore(snapshot)
+        if self.CACHE is None or snapshot is not None:
+            self.obj["generation_data"] = self._iterate(n)
+        else:
+            self.obj["generation_data"] = self._iterate_cached(n)
+        return self.obj
+
+    def write_event_log(self, path, seed=None, n=10):
+        # Stream a run straight to the binary format in eventlog.py, read back with eventlog.EventLogReader.
+        from eventlog import EventLogWriter
+        self.iter_generate(seed, n)
+        with EventLogWriter(path, self.obj["general_info"], n) as writer:
+            for iteration_obj in self.obj["generation_data"]:
+                writer.write(iteration_obj)
+
+    def _start(self, seed, n):
         self.obj = {
             "general_info": {},
             "generation_data": [],
@@ -15,151 +106,281 @@ class AztecGenerator:
         if seed is None:
             seed = self._generate_seed_string()
         self.seed = seed
-        random.seed(seed)
+        self.current_id = 0
+        self.rng = SequentialRNG(seed) if self.SEQUENTIAL_RNG else CounterRNG(seed)
         self.obj["general_info"]["seed"] = seed
+        # With the seed, this fixes the generation data (SquareDanceAnimator keys its partial movie files by both).
+        self.obj["general_info"]["engine_version"] = self.engine_version()
         self.obj["size"] = n
-        # Generate.
-        self.area = []
-        for x in range(n):
-            self.obj["generation_data"].append({
+
+    def _iterate(self, n):
+        for x in range(self.iteration, n):
+            if self.PROFILER is not None:
+                self.PROFILER.start("generator")
+            destroyed, moved, created = self.step_generate()
+            if self.PROFILER is not None:
+                self.PROFILER.record("generator", x)
+            self.iteration = x + 1
+            iteration_obj = {
                 "iteration": x,
-                "created_blocks": [],
-                "destroyed_blocks": [],
-                "moved_blocks": [],
-            })
-            (
-                self.obj["generation_data"][-1]["destroyed_blocks"], 
-                self.obj["generation_data"][-1]["moved_blocks"], 
-                self.obj["generation_data"][-1]["created_blocks"]
-            ) = self.step_generate()
+                "created_blocks": created,
+                "destroyed_blocks": destroyed,
+                "moved_blocks": moved,
+            }
+            if self.TRACK_FROZEN:
+                iteration_obj["frozen_runs"] = copy.deepcopy(self.frozen)
+            yield iteration_obj
+
+    def _iterate_cached(self, n):
+        version = self.engine_version()
+        entry = self.CACHE.load(self.seed, version)
+        generation_data = [] if entry is None else entry["generation_data"]
+        if entry is not None:
+            # The board isn't stepped while cached iterations are replayed, so there is no state to snapshot
+            # until the cached snapshot is restored after them. Only a longer cached run leaves it that way.
+            self.iteration = None
+        yield from generation_data[:n]
+        if len(generation_data) > n:
+            return
+        if entry is not None:
+            self.restore(entry["snapshot"])
+        if len(generation_data) == n:
+            return
+        for iteration_obj in self._iterate(n):
+            generation_data.append(iteration_obj)
+            yield iteration_obj
+        self.CACHE.save(self.seed, version, generation_data, self.snapshot())
+
+    def engine_version(self):
+        # Runs with the same seed and engine version produce the same generation data and snapshots.
+        rng = "sequential" if self.SEQUENTIAL_RNG else "counter"
+        frozen = "-frozen" if self.TRACK_FROZEN else ""
+        return f"{self.ENGINE}-{rng}-{self.GENERATION_VERSION}{frozen}"
+
+    def snapshot(self):
+        # The complete state after self.iteration iterations of iter_generate, to pass to restore
+        # or iter_generate(snapshot=...).
+        if self.iteration is None:
+            raise ValueError("Iterations replayed from a longer cached run leave no generator state to snapshot.")
+        return copy.deepcopy({
+            "seed": self.seed,
+            "engine": self.ENGINE,
+            "sequential_rng": self.SEQUENTIAL_RNG,
+            "iteration": self.iteration,
+            "current_id": self.current_id,
+            "rng": self.rng.getstate(),
+            "frozen": self.frozen,
+            "board": self.board if self.ENGINE == "numpy" else self.area,
+            "dominoes": None if self.ENGINE == "numpy" else self.dominoes,
+        })
+
+    def restore(self, snapshot):
+        # Put the generator in the state of a snapshot, seed, engine and RNG mode included, so any
+        # generator can step on from it. iter_generate(snapshot=...) does this and yields what follows.
+        snapshot = copy.deepcopy(snapshot)
+        self.seed = snapshot["seed"]
+        self.ENGINE = snapshot["engine"]
+        self.SEQUENTIAL_RNG = snapshot["sequential_rng"]
+        self.iteration = snapshot["iteration"]
+        self.current_id = snapshot["current_id"]
+        self.rng = SequentialRNG(self.seed) if self.SEQUENTIAL_RNG else CounterRNG(self.seed)
+        self.rng.setstate(snapshot["rng"])
+        self.frozen = snapshot.get("frozen")
+        if self.ENGINE == "numpy":
+            self.board = snapshot["board"]
+        else:
+            self.area = snapshot["board"]
+            self.dominoes = snapshot["dominoes"]
+
+    def generate_tiling(self, seed=None, n=10, pool=None):
+        # Only compute the final tiling: no events are recorded and the board is bit-packed,
+        # which allows much larger n. See shuffling.PackedBoard.
+        # The tiling matches the final board of generate for the same seed.
+        # With a process pool, each step is split into row bands across it.
+        from functools import partial
+        from shuffling import PackedBoard
+        if pool is not None and self.SEQUENTIAL_RNG:
+            raise ValueError("Sequential coin flips depend on the scan order, so a step can't be split across a pool.")
+        self._start(seed, n)
+        self.tiling = PackedBoard(n, self.BAND_ROWS)
+        for x in range(n):
+            self.tiling.step(partial(self.rng.flips, x), pool)
+        self.obj["final_result"]["tiling"] = self.tiling.packed
+        return self.tiling
+
+    def save_tiling_image(self, path, cell_size=1):
+        # Write the tiling from generate_tiling as a .png or .ppm, coloured like ARROW_FINAL_BG_KWARGS.
+        from images import write_tiling_image
+        write_tiling_image(self.tiling, path, cell_size)
 
     def step_generate(self):
+        if self.ENGINE == "numpy":
+            result = self._step_generate_numpy()
+        else:
+            result = self._step_generate_python()
+        if self.TRACK_FROZEN:
+            self._update_frozen()
+            self._lap("frozen")
+        return result
+
+    def _direction_code(self, a, b):
+        if self.ENGINE == "numpy":
+            return int(self.board.direction[a, b]) if self.board.occupied[a, b] else None
+        id = self.area[a][b]
+        return None if id < 0 else self.dominoes.direction[id]
+
+    def _update_frozen(self):
+        # A frozen domino points at its edge with only frozen dominoes between them. Each step it moves
+        # out by a cell as the diamond does, and nothing can point back into it, so it stays frozen at the
+        # same distance from the edge. Runs therefore never shrink, and each is rescanned only from its
+        # previous length: O(n) per step, plus O(n^2) in total as the runs grow.
+        size = self.board.size if self.ENGINE == "numpy" else len(self.area)
+        old = self.frozen
+        if old is not None and len(old["left"]) == size - 2:
+            runs = {edge: [0] + old[edge] + [0] for edge in old}
+        elif old is not None and len(old["left"]) == size:
+            runs = old
+        else:
+            # Any lower bound is fine to scan from.
+            runs = {edge: [0] * size for edge, _, _, _ in FROZEN_EDGES}
+        for edge, code, row, step in FROZEN_EDGES:
+            run = runs[edge]
+            for a in range(size):
+                lo, length = _diamond_line(size, a)
+                first = lo if step == 1 else lo + length - 1
+                k = run[a]
+                while k < length and self._direction_code(*((a, first + step * k) if row else (first + step * k, a))) == code:
+                    k += 1
+                run[a] = k
+        self.frozen = runs
+
+    def _lap(self, phase):
+        if self.PROFILER is not None:
+            self.PROFILER.lap("generator", phase)
+
+    def _step_generate_python(self):
+        # self.area holds the id of the domino covering each cell (see self.dominoes), or EMPTY or OUTSIDE.
+        dominoes = self.dominoes
         removed = []
         moved = []
         created = []
         # Increase the area by one.
         self.area = [[]] + self.area + [[]]
         for x in range(1, len(self.area)-1):
-            self.area[x] = [None] + self.area[x] + [None]
-        self.area[0] = [None] * len(self.area)
-        self.area[-1] = [None] * len(self.area)
+            self.area[x] = [OUTSIDE] + self.area[x] + [OUTSIDE]
+        self.area[0] = [OUTSIDE] * len(self.area)
+        self.area[-1] = [OUTSIDE] * len(self.area)
+        half = len(self.area) // 2
         # Expand the visible region
         for a in range(len(self.area)):
             for b in range(len(self.area[0])):
-                manhattan = math.ceil(abs(a + 0.5 - len(self.area) // 2)) + math.ceil(abs(b + 0.5 - len(self.area[0]) // 2)) - 1
-                if manhattan <= len(self.area) // 2 and self.area[a][b] is None:
-                    self.area[a][b] = "EMPTY"
+                manhattan = math.ceil(abs(a + 0.5 - half)) + math.ceil(abs(b + 0.5 - half)) - 1
+                if manhattan <= half and self.area[a][b] == OUTSIDE:
+                    self.area[a][b] = EMPTY
+        self._lap("expand")
         # Remove any existing opposite arrows
         for a in range(len(self.area)):
             for b in range(len(self.area[0])):
-                if self.area[a][b] not in [None, "EMPTY"]:
-                    dx, dy = self.area[a][b]["direction"]
-                    if self.area[a+dx][b+dy] not in [None, "EMPTY"]:
-                        cx, cy = self.area[a+dx][b+dy]["direction"]
-                        if cx == -dx and cy == -dy:
-                            # They point inwards. Remove.
-                            removed.append([
-                                self.area[a][b]["id"],
-                                self.area[a+dx][b+dy]["id"],
-                            ])
-                            ca, cb = self.area[a][b]["neighbour"]
-                            da, db = self.area[a+dx][b+dy]["neighbour"]
-                            self.area[a][b] = "EMPTY"
-                            self.area[a+dx][b+dy] = "EMPTY"
-                            self.area[a+ca][b+cb] = "EMPTY"
-                            self.area[a+dx+da][b+dy+db] = "EMPTY"
-        # Move the remaining arrows
-        for a in range(len(self.area)):
-            for b in range(len(self.area[0])):
-                if self.area[a][b] not in [None, "EMPTY"]:
-                    # Just reset the moved variable for the next loop.
-                    self.area[a][b]["moved"] = False
-        new_area = [[None if v is None else "EMPTY" for v in row] for row in self.area]
+                id = self.area[a][b]
+                if id >= 0:
+                    dx, dy = DIRECTIONS[dominoes.direction[id]]
+                    other = self.area[a+dx][b+dy]
+                    if other >= 0 and dominoes.direction[other] == OPPOSITE[dominoes.direction[id]]:
+                        # They point inwards. Remove.
+                        removed.append([id, other])
+                        for x, y in dominoes.cells(id) + dominoes.cells(other):
+                            self.area[x + half][y + half] = EMPTY
+                        dominoes.alive[id] = 0
+                        dominoes.alive[other] = 0
+        self._lap("annihilate")
+        # Move the remaining arrows, each from its top left cell.
+        new_area = [[OUTSIDE if v == OUTSIDE else EMPTY for v in row] for row in self.area]
         for a in range(len(self.area)):
             for b in range(len(self.area[0])):
-                if self.area[a][b] not in [None, "EMPTY"] and not self.area[a][b]["moved"]:
-                    dx, dy = self.area[a][b]["direction"]
-                    na, nb = self.area[a][b]["neighbour"]
-                    new_area[a+dx][b+dy] = self.area[a][b]
-                    new_area[a+na+dx][b+nb+dy] = self.area[a+na][b+nb]
-                    self.area[a][b]["moved"] = True
-                    self.area[a+na][b+nb]["moved"] = True
-                    moved.append([self.area[a][b]["id"], self.area[a][b]["direction"]])
+                id = self.area[a][b]
+                if id >= 0 and dominoes.x[id] == a - half and dominoes.y[id] == b - half:
+                    dx, dy = DIRECTIONS[dominoes.direction[id]]
+                    for x, y in dominoes.cells(id):
+                        new_area[x + half + dx][y + half + dy] = id
+                    dominoes.x[id] += dx
+                    dominoes.y[id] += dy
+                    moved.append([id, [dx, dy]])
         self.area = new_area
+        self._lap("slide")
         # Generate new arrows
         for a in range(len(self.area) - 1):
             for b in range(len(self.area[0]) - 1):
                 if (
-                    self.area[a][b] == "EMPTY" and 
-                    self.area[a+1][b] == "EMPTY" and
-                    self.area[a][b+1] == "EMPTY" and
-                    self.area[a+1][b+1] == "EMPTY"
+                    self.area[a][b] == EMPTY and
+                    self.area[a+1][b] == EMPTY and
+                    self.area[a][b+1] == EMPTY and
+                    self.area[a+1][b+1] == EMPTY
                 ):
                     # Generate a square
-                    if random.random() > 0.5:
+                    x, y = a - half, b - half
+                    if self.rng.flip(half - 1, x, y):
                         # Up/Down. Remember x is down, y is right.
-                        self.area[a][b] = {
-                            "direction": [-1, 0],
-                            "neighbour": [0, 1],
-                            "id": self.current_id,
-                        }
-                        self.area[a][b+1] = {
-                            "direction": [-1, 0],
-                            "neighbour": [0, -1],
-                            "id": self.current_id,
-                        }
-                        self.current_id += 1
-                        self.area[a+1][b] = {
-                            "direction": [1, 0],
-                            "neighbour": [0, 1],
-                            "id": self.current_id,
-                        }
-                        self.area[a+1][b+1] = {
-                            "direction": [1, 0],
-                            "neighbour": [0, -1],
-                            "id": self.current_id,
-                        }
-                        self.current_id += 1
+                        first = dominoes.add(x, y, UP)
+                        second = dominoes.add(x + 1, y, DOWN)
+                        self.area[a][b] = self.area[a][b+1] = first
+                        self.area[a+1][b] = self.area[a+1][b+1] = second
                         created.append([
-                            [self.current_id - 2, [[a - len(self.area)//2, b - len(self.area)//2], [a - len(self.area)//2, b - len(self.area)//2+1]], (-1, 0)],
-                            [self.current_id - 1, [[a - len(self.area)//2+1, b - len(self.area)//2], [a - len(self.area)//2+1, b - len(self.area)//2+1]], (1, 0)],
+                            [first, [[x, y], [x, y+1]], (-1, 0)],
+                            [second, [[x+1, y], [x+1, y+1]], (1, 0)],
                         ])
                     else:
                         # Left/Right. Remember x is down, y is right.
-                        self.area[a][b] = {
-                            "direction": [0, -1],
-                            "neighbour": [1, 0],
-                            "id": self.current_id,
-                        }
-                        self.area[a+1][b] = {
-                            "direction": [0, -1],
-                            "neighbour": [0, -1],
-                            "id": self.current_id,
-                        }
-                        self.current_id += 1
-                        self.area[a][b+1] = {
-                            "direction": [0, 1],
-                            "neighbour": [1, 0],
-                            "id": self.current_id,
-                        }
-                        self.area[a+1][b+1] = {
-                            "direction": [0, 1],
-                            "neighbour": [0, -1],
-                            "id": self.current_id,
-                        }
-                        self.current_id += 1
+                        first = dominoes.add(x, y, LEFT)
+                        second = dominoes.add(x, y + 1, RIGHT)
+                        self.area[a][b] = self.area[a+1][b] = first
+                        self.area[a][b+1] = self.area[a+1][b+1] = second
                         created.append([
-                            [self.current_id - 2, [[a - len(self.area)//2, b - len(self.area)//2], [a - len(self.area)//2+1, b - len(self.area)//2]], (0, -1)],
-                            [self.current_id - 1, [[a - len(self.area)//2, b - len(self.area)//2+1], [a - len(self.area)//2+1, b - len(self.area)//2+1]], (0, 1)],
+                            [first, [[x, y], [x+1, y]], (0, -1)],
+                            [second, [[x, y+1], [x+1, y+1]], (0, 1)],
                         ])
+                    self.current_id += 2
+        self._lap("fill")
+        return removed, moved, created
+
+    def _step_generate_numpy(self):
+        import numpy as np
+        board = self.board
+        board.expand()
+        half = board.size // 2
+        self._lap("expand")
+        # Remove any existing opposite arrows
+        _, _, first, second = board.annihilate()
+        removed = [list(pair) for pair in zip(first.tolist(), second.tolist())]
+        self._lap("annihilate")
+        # Move the remaining arrows
+        ids, codes = board.slide()
+        directions = [list(d) for d in DIRECTIONS]
+        moved = [[id, directions[code]] for id, code in zip(ids.tolist(), codes.tolist())]
+        self._lap("slide")
+        # Generate new arrows, drawing in the same row major order as the python engine.
+        xs, ys = board.empty_blocks()
+        up_down = np.asarray(self.rng.flips(half - 1, xs - half, ys - half), dtype=bool)
+        board.fill(xs, ys, up_down, self.current_id)
+        created = []
+        for a, b, vertical in zip((xs - half).tolist(), (ys - half).tolist(), up_down.tolist()):
+            if vertical:
+                created.append([
+                    [self.current_id, [[a, b], [a, b+1]], (-1, 0)],
+                    [self.current_id + 1, [[a+1, b], [a+1, b+1]], (1, 0)],
+                ])
+            else:
+                created.append([
+                    [self.current_id, [[a, b], [a+1, b]], (0, -1)],
+                    [self.current_id + 1, [[a, b+1], [a+1, b+1]], (0, 1)],
+                ])
+            self.current_id += 2
+        self._lap("fill")
         return removed, moved, created
 
     def _generate_seed_string(self):
-        import time
-        random.seed(time.time())
         # Generate an string so that you can share the seed rather easily.
         digits = list(map(str, range(10))) + list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
-        v = random.randint(0, pow(len(digits), self.STRING_SIZE))
+        v = random.Random().randint(0, pow(len(digits), self.STRING_SIZE))
         if v == 0:
             return digits[0]
         result = []
@@ -170,4 +391,56 @@ class AztecGenerator:
             result = result + [digits[0]]
         return ''.join(result[::-1])
 
-        
\ No newline at end of file
+
+def main(argv=None):
+    """
+    Generate tilings from the command line, without manim:
+
+        python generation.py -n 50 100 --seeds ABC123 XYZ789 --format eventlog -o runs/
+
+    Writes one file per seed and size, named <seed>_<n>.<format>. json and eventlog hold every iteration,
+    png, ppm and npy only the final tiling (npy being the packed board from generate_tiling).
+    Imports are kept lazy so the command starts quickly: json and eventlog never import numpy, the
+    formats from generate_tiling do (as does --engine numpy).
+    """
+    import argparse, os
+    parser = argparse.ArgumentParser(description="Generate Aztec diamond tilings by domino shuffling.")
+    parser.add_argument("-n", type=int, nargs="+", default=[10], help="sizes to generate")
+    parser.add_argument("--seeds", nargs="*", default=[], help="seeds to run, see also --random")
+    parser.add_argument("--random", type=int, default=0, help="number of random seeds to run as well")
+    parser.add_argument("--format", choices=["json", "eventlog", "png", "ppm", "npy"], default="eventlog")
+    parser.add_argument("--engine", choices=["python", "numpy"], default=AztecGenerator.ENGINE)
+    parser.add_argument("--sequential-rng", action="store_true", help="coin flips as before counter based seeding")
+    parser.add_argument("--cell-size", type=int, default=1, help="pixels per cell for png and ppm")
+    parser.add_argument("-o", "--output", default=".", help="directory to write to")
+    args = parser.parse_args(argv)
+    seeds = args.seeds + [AztecGenerator()._generate_seed_string() for _ in range(args.random)]
+    if not seeds:
+        parser.error("give --seeds or --random")
+    os.makedirs(args.output, exist_ok=True)
+    extension = {"eventlog": "bin"}.get(args.format, args.format)
+    for seed in seeds:
+        for n in args.n:
+            a = AztecGenerator()
+            a.ENGINE = args.engine
+            a.SEQUENTIAL_RNG = args.sequential_rng
+            path = os.path.join(args.output, f"{seed}_{n}.{extension}")
+            if args.format == "json":
+                import json
+                a.generate(seed, n)
+                with open(path, "w") as f:
+                    json.dump(a.obj, f)
+            elif args.format == "eventlog":
+                a.write_event_log(path, seed, n)
+            else:
+                a.generate_tiling(seed, n)
+                if args.format == "npy":
+                    import numpy as np
+                    np.save(path, a.tiling.packed)
+                else:
+                    a.save_tiling_image(path, args.cell_size)
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
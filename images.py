@@ -0,0 +1,72 @@
+import struct, zlib
+import numpy as np
+
+# Colours of SquareDanceAnimator.ARROW_FINAL_BG_KWARGS by direction code (up, down, left, right),
+# then the scene background for cells outside the diamond.
+PALETTE = np.array([
+    [0xFF, 0xFF, 0x00],
+    [0xFC, 0x62, 0x55],
+    [0x83, 0xC1, 0x67],
+    [0x58, 0xC4, 0xDD],
+    [0xFE, 0xEA, 0xFA],
+], dtype=np.uint8)
+
+
+class PPMWriter:
+
+    def __init__(self, f, width, height):
+        self.f = f
+        f.write(f"P6\n{width} {height}\n255\n".encode())
+
+    def write_rows(self, pixels):
+        self.f.write(np.ascontiguousarray(pixels).tobytes())
+
+    def close(self):
+        pass
+
+
+class PNGWriter:
+
+    def __init__(self, f, width, height):
+        self.f = f
+        self.compressor = zlib.compressobj()
+        f.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bit RGB, no interlacing.
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self.f.write(struct.pack(">I", len(data)) + kind + data)
+        self.f.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write_rows(self, pixels):
+        # Every scanline starts with filter type 0.
+        lines = np.concatenate([np.zeros((pixels.shape[0], 1), dtype=np.uint8), pixels.reshape(pixels.shape[0], -1)], axis=1)
+        data = self.compressor.compress(lines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        self._chunk(b"IDAT", self.compressor.flush())
+        self._chunk(b"IEND", b"")
+
+
+def write_tiling_image(tiling, path, cell_size=1, band_columns=256):
+    """
+    Write a shuffling.PackedBoard as a .png (or otherwise .ppm) image, cell_size pixels per cell.
+    The board is laid out as SquareDanceAnimator draws it: board rows go left to right, board
+    columns go bottom to top. Bands of board columns are written in turn, so memory stays bounded.
+    """
+    size = 2 * tiling.n
+    with open(path, "wb") as f:
+        writer_class = PNGWriter if str(path).lower().endswith(".png") else PPMWriter
+        writer = writer_class(f, size * cell_size, size * cell_size)
+        for c1 in range(tiling.width, 0, -band_columns):
+            c0 = max(c1 - band_columns, 0)
+            codes = tiling.codes(0, size, c0, c1)[:, :max(min(c1, size) - c0, 0)]
+            pixels = PALETTE[np.where(codes < 0, len(PALETTE) - 1, codes)]
+            # Highest board column first, as the top row of the image.
+            pixels = pixels.transpose(1, 0, 2)[::-1]
+            pixels = np.repeat(np.repeat(pixels, cell_size, axis=0), cell_size, axis=1)
+            if len(pixels):
+                writer.write_rows(pixels)
+        writer.close()
@@ -0,0 +1,48 @@
+import json, time, tracemalloc
+
+
+class Profiler:
+    """
+    Per iteration timings for AztecGenerator and SquareDanceAnimator, set as their PROFILER.
+    Each iteration is written as one JSON line: the source ("generator" or "animator"), the iteration,
+    seconds spent in each phase, the peak traced memory since the previous line, and anything
+    else the source adds (the animator adds its mobject count). Lines are appended, and label
+    tells runs apart in a shared file.
+    """
+
+    def __init__(self, path, label=None, trace_memory=True):
+        self.f = open(path, "a")
+        self.label = label
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.phases = {}
+        self.last = {}
+
+    def start(self, source):
+        self.phases[source] = {}
+        self.last[source] = time.perf_counter()
+
+    def lap(self, source, phase):
+        # Time since the last lap (or start) goes to phase.
+        now = time.perf_counter()
+        phases = self.phases.setdefault(source, {})
+        phases[phase] = phases.get(phase, 0) + now - self.last.get(source, now)
+        self.last[source] = now
+
+    def record(self, source, iteration, **fields):
+        line = {"label": self.label, "source": source, "iteration": iteration, "phases": self.phases.pop(source, {})}
+        if self.trace_memory:
+            line["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        line.update(fields)
+        self.f.write(json.dumps(line) + "\n")
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,107 @@
+"""
+Flat colour renderer for generation data, without manim.
+
+RasterRenderer draws what SquareDanceAnimator shows with ARROW_FINAL_BG_KWARGS and no arrows
+(the look of VideoAnimation.super_fast): every domino a filled rectangle in its direction's colour
+with a black outline, on the scene background. Frames are painted in NumPy from a grid of cells,
+and piped as raw RGB to ffmpeg.
+"""
+import subprocess
+import numpy as np
+from dominoes import DOWN, DominoTable
+from images import PALETTE
+
+BORDER = np.array([0, 0, 0], dtype=np.uint8)
+
+
+class RasterRenderer:
+
+    WIDTH = 1920
+    HEIGHT = 1080
+    FRAME_RATE = 60
+    # Outline width in pixels, left out once cells are smaller than three outlines.
+    BORDER_WIDTH = 2
+    # Seconds per iteration at SPEED 1, and how long the final tiling stays on screen.
+    ITERATION_TIME = 1
+    FINAL_WAIT = 1
+    SPEED = lambda self, i: 1
+    FFMPEG = "ffmpeg"
+    FFMPEG_OUTPUT_ARGS = ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
+
+    def __init__(self):
+        self.dominoes = DominoTable()
+
+    def render(self, obj, path):
+        # obj is anything SquareDanceAnimator.from_obj takes: a generated obj, a streaming one or an EventLogReader.
+        command = [
+            self.FFMPEG, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{self.WIDTH}x{self.HEIGHT}", "-r", str(self.FRAME_RATE),
+            "-i", "-",
+            *self.FFMPEG_OUTPUT_ARGS, str(path),
+        ]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            for frame, repeat in self.frames(obj):
+                data = frame.tobytes()
+                for _ in range(repeat):
+                    process.stdin.write(data)
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"{self.FFMPEG} exited with code {process.returncode}")
+
+    def frames(self, obj):
+        # Yields (frame, number of times to show it). Iterations shorter than a frame only update the board.
+        self.dominoes = DominoTable()
+        clock = 0
+        shown = 0
+        iteration = None
+        for iteration_obj in obj["generation_data"]:
+            iteration = iteration_obj["iteration"]
+            self.apply_iteration(iteration_obj)
+            clock += self.ITERATION_TIME / self.SPEED(iteration)
+            repeat = int(clock * self.FRAME_RATE) - shown
+            if repeat > 0:
+                shown += repeat
+                yield self.paint(iteration), repeat
+        if iteration is not None:
+            yield self.paint(iteration), max(1, int(self.FINAL_WAIT * self.FRAME_RATE))
+
+    def apply_iteration(self, iteration_obj):
+        self.dominoes.apply(iteration_obj)
+
+    def paint(self, iteration):
+        # The camera is centred on the board, with height 2 * iteration + 5 cells as in SquareDanceAnimator's RESIZE.
+        pixels_per_cell = self.HEIGHT / (2 * iteration + 5)
+        # Scene coordinates (in cells) of each pixel column and row centre; x goes right and y up.
+        xs = (np.arange(self.WIDTH) + 0.5 - self.WIDTH / 2) / pixels_per_cell
+        ys = (self.HEIGHT / 2 - np.arange(self.HEIGHT) - 0.5) / pixels_per_cell
+        cx, cy = np.floor(xs).astype(np.int64), np.floor(ys).astype(np.int64)
+        x0, y0 = cx.min() - 1, cy.min() - 1
+        # Per-cell direction codes and ids, with a border of background cells around the view.
+        codes = np.full((cx.max() - x0 + 2, cy.max() - y0 + 2), len(PALETTE) - 1, dtype=np.int64)
+        ids = np.full(codes.shape, -1, dtype=np.int64)
+        xs_all, ys_all, codes_all, alive = self.dominoes.arrays()
+        live = np.nonzero(alive)[0]
+        x, y, code = xs_all[live].astype(np.int64) - x0, ys_all[live].astype(np.int64) - y0, codes_all[live].astype(np.int64)
+        # Up and down dominoes cover (x, y + 1), left and right ones (x + 1, y).
+        for px, py in ((x, y), (x + (code > DOWN), y + (code <= DOWN))):
+            inside = (px >= 0) & (px < codes.shape[0]) & (py >= 0) & (py < codes.shape[1])
+            codes[px[inside], py[inside]] = code[inside]
+            ids[px[inside], py[inside]] = live[inside]
+        ix, iy = cx - x0, cy - y0
+        frame = PALETTE[codes[ix][:, iy]].transpose(1, 0, 2)
+        if pixels_per_cell >= 3 * self.BORDER_WIDTH:
+            # Outline any cell edge between two different dominoes, or a domino and the background.
+            edge = self.BORDER_WIDTH / 2 / pixels_per_cell
+            near_left, near_right = xs - cx < edge, cx + 1 - xs <= edge
+            near_bottom, near_top = ys - cy < edge, cy + 1 - ys <= edge
+            cell_ids = ids[ix][:, iy]
+            border = (
+                (near_left[:, None] & (cell_ids != ids[ix - 1][:, iy])) |
+                (near_right[:, None] & (cell_ids != ids[ix + 1][:, iy])) |
+                (near_bottom[None, :] & (cell_ids != ids[ix][:, iy - 1])) |
+                (near_top[None, :] & (cell_ids != ids[ix][:, iy + 1]))
+            )
+            frame[border.T] = BORDER
+        return frame
@@ -0,0 +1,78 @@
+"""
+Render VideoAnimation with each section (or each range of a section's iterations) as its own manim
+process, then join the pieces losslessly with ffmpeg's concat demuxer.
+
+    python render_parallel.py -o video.mp4 --workers 4 --ranges 2 -- -ql
+
+Arguments after -- are passed on to manim. Ranges after the first catch up to their starting
+iteration without rendering (generation itself is replayed from the generation cache), so the
+pieces join into the same video a single process would render.
+"""
+import argparse, glob, json, os, subprocess, sys
+from concurrent.futures import ThreadPoolExecutor
+from generation import AztecGenerator
+from video import VideoAnimation
+
+
+def jobs(scene_class, ranges=1, seed=None):
+    # [section, seed, start, stop] for each piece, in video order.
+    result = []
+    for section in scene_class.SECTIONS:
+        n = scene_class.SECTION_ITERATIONS[section]
+        # Every range of a section needs the same tiling, so the seed is picked here when none is fixed.
+        section_seed = seed or scene_class.SEED or AztecGenerator()._generate_seed_string()
+        bounds = [round(n * k / ranges) for k in range(ranges + 1)]
+        for start, stop in zip(bounds, bounds[1:]):
+            if stop > start:
+                result.append([section, section_seed, start, stop])
+    return result
+
+
+def render_job(job, media_dir, manim_args=()):
+    # Each piece keeps its own media directory, so manim's partial movie cache carries over between runs.
+    section, _, start, stop = job
+    media = os.path.join(media_dir, f"{section}_{start}_{stop}")
+    # The video lands in a directory named after the quality, so remove any from earlier runs (maybe at
+    # another quality) first: the only one left afterwards is this run's. Partial movie files are kept.
+    pattern = os.path.join(media, "videos", "**", "VideoAnimation.mp4")
+    for stale in glob.glob(pattern, recursive=True):
+        os.remove(stale)
+    subprocess.run(
+        [sys.executable, "-m", "manim", "video.py", "VideoAnimation", "--media_dir", media, *manim_args],
+        env=dict(os.environ, VIDEO_JOB=json.dumps(job)),
+        check=True,
+    )
+    (path,) = glob.glob(pattern, recursive=True)
+    return path
+
+
+def concatenate(paths, output, media_dir):
+    listing = os.path.join(media_dir, "segments.txt")
+    with open(listing, "w") as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", output],
+        check=True,
+    )
+
+
+def render_parallel(output, workers=None, ranges=1, seed=None, media_dir=os.path.join("media", "parallel"), manim_args=()):
+    os.makedirs(media_dir, exist_ok=True)
+    pieces = jobs(VideoAnimation, ranges, seed)
+    # The work happens in the manim processes, threads only wait on them.
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        paths = list(pool.map(lambda job: render_job(job, media_dir, manim_args), pieces))
+    concatenate(paths, output, media_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render VideoAnimation in parallel pieces.")
+    parser.add_argument("-o", "--output", default="VideoAnimation.mp4")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ranges", type=int, default=1, help="pieces to split each section's iterations into")
+    parser.add_argument("--seed", default=None)
+    parser.add_argument("--media-dir", default=os.path.join("media", "parallel"))
+    parser.add_argument("manim_args", nargs="*")
+    args = parser.parse_args()
+    render_parallel(args.output, args.workers, args.ranges, args.seed, args.media_dir, args.manim_args)
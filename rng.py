@@ -0,0 +1,70 @@
+import hashlib, random
+
+MASK = (1 << 64) - 1
+# Odd multipliers spreading the iteration and block position over the 64 bit counter.
+ITERATION_STEP = 0x9E3779B97F4A7C15
+X_STEP = 0xD1B54A32D192ED03
+Y_STEP = 0x8CB92BA72F3D8DD7
+
+
+def seed_key(seed):
+    return int.from_bytes(hashlib.blake2b(str(seed).encode(), digest_size=8).digest(), "little")
+
+
+class CounterRNG:
+    """
+    Counter based coin flips. The flip for the block with top left cell (x, y) (relative to the centre)
+    on a given iteration is a hash of the seed, iteration and position (the splitmix64 finaliser),
+    so it does not depend on the order blocks are visited in. There is no state beyond the seed.
+    """
+
+    def __init__(self, seed):
+        self.key = seed_key(seed)
+
+    def getstate(self):
+        return None
+
+    def setstate(self, state):
+        pass
+
+    def flip(self, iteration, x, y):
+        z = (self.key + iteration * ITERATION_STEP + x * X_STEP + y * Y_STEP) & MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+        z ^= z >> 31
+        return z >> 63 == 1
+
+    def flips(self, iteration, xs, ys):
+        # Vectorised flip over arrays of positions.
+        import numpy as np
+        # Viewing int64 as uint64 wraps negative positions mod 2**64, as the & MASK above does.
+        xs = np.asarray(xs, dtype=np.int64).view(np.uint64)
+        ys = np.asarray(ys, dtype=np.int64).view(np.uint64)
+        with np.errstate(over="ignore"):
+            z = xs * np.uint64(X_STEP) + ys * np.uint64(Y_STEP) + np.uint64((self.key + iteration * ITERATION_STEP) & MASK)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            z ^= z >> np.uint64(31)
+        return z >> np.uint64(63) == 1
+
+
+class SequentialRNG:
+    """
+    The original coin flips: one draw from a seeded random.Random per block, in row major order.
+    Reproduces seeds shared before CounterRNG, but ties the result to the scan order.
+    """
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def getstate(self):
+        return self.random.getstate()
+
+    def setstate(self, state):
+        self.random.setstate(state)
+
+    def flip(self, iteration, x, y):
+        return self.random.random() > 0.5
+
+    def flips(self, iteration, xs, ys):
+        return [self.random.random() > 0.5 for _ in range(len(xs))]
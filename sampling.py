@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+from generation import AztecGenerator
+
+
+def direction_counts(seeds, n):
+    # counts[code, x, y] is how many of the final tilings for seeds have direction code at cell (x, y).
+    counts = np.zeros((4, 2 * n, 2 * n), dtype=np.int64)
+    for seed in seeds:
+        a = AztecGenerator()
+        codes = a.generate_tiling(seed=seed, n=n).codes()[:, :2 * n]
+        for code in range(4):
+            counts[code] += codes == code
+    return counts
+
+
+def sample_direction_counts(seeds, n, workers=None, chunks_per_worker=4):
+    """
+    Run generate_tiling for every seed across a process pool, and sum the direction counts
+    (see direction_counts). Each worker reduces its own chunk of seeds, so only the count arrays
+    travel between processes. Integer sums make the result independent of the number of workers.
+    Divide by len(seeds) for per cell direction frequencies.
+    """
+    seeds = list(seeds)
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        return direction_counts(seeds, n)
+    n_chunks = max(1, min(len(seeds), workers * chunks_per_worker))
+    with ProcessPoolExecutor(workers) as pool:
+        chunks = [seeds[i::n_chunks] for i in range(n_chunks)]
+        total = np.zeros((4, 2 * n, 2 * n), dtype=np.int64)
+        for counts in pool.map(direction_counts, chunks, [n] * n_chunks):
+            total += counts
+    return total
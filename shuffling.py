@@ -0,0 +1,269 @@
+import numpy as np
+from dominoes import DIRECTIONS, DOWN, LEFT, OPPOSITE, RIGHT, UP
+
+# The (dx, dy) of each direction code in dominoes.py, to index with arrays of codes.
+DIRECTION_VECTORS = np.array(DIRECTIONS)
+# Offsets of the four cells of a 2x2 block from its top left cell.
+BLOCK_CELLS = [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def diamond(size):
+    # Cells of a size x size board inside the aztec diamond of order size // 2.
+    centre = size // 2
+    offsets = np.abs(np.arange(size) + 0.5 - centre)
+    return offsets[:, None] + offsets[None, :] <= centre
+
+
+def neighbour(arr, dx, dy, fill):
+    # result[a, b] = arr[a+dx, b+dy], or fill if that falls off the board.
+    result = np.full_like(arr, fill)
+    h, w = arr.shape
+    result[max(0, -dx):h - max(0, dx), max(0, -dy):w - max(0, dy)] = \
+        arr[max(0, dx):h - max(0, -dx), max(0, dy):w - max(0, -dy)]
+    return result
+
+
+def run_offset(mask):
+    # How far each cell is from the start of its run of True cells along its row.
+    index = np.arange(mask.shape[1])
+    starts = np.where(mask & ~neighbour(mask, 0, -1, False), index, 0)
+    return index - np.maximum.accumulate(starts, axis=1)
+
+
+def block_corners(empty, x0, y0, order):
+    """
+    The top left cells of the 2x2 blocks tiling the holes left after sliding, for a window of a board
+    whose first cell is (x0, y0) relative to the centre, on the step growing the diamond to order.
+    The holes tile uniquely into 2x2 blocks whose top left cells share one colour of the checkerboard,
+    and every block covers two consecutive cells of each row it meets. So a top left cell is exactly
+    an empty cell of that colour at an even offset into its row's run of empty cells, and every row
+    can be decided on its own.
+    """
+    xs = np.arange(x0, x0 + empty.shape[0])
+    ys = np.arange(y0, y0 + empty.shape[1])
+    colour = np.add.outer(xs, ys) % 2 == (order + 1) % 2
+    return empty & colour & (run_offset(empty) % 2 == 0)
+
+
+def block_codes(up_down, dx, dy):
+    # Direction codes of cell (dx, dy) of freshly filled blocks.
+    # Up/Down: the top row points up. Left/Right: the left column points left.
+    second = np.where(up_down, dx, dy).astype(bool)
+    return np.where(
+        up_down,
+        np.where(second, DOWN, UP),
+        np.where(second, RIGHT, LEFT),
+    )
+
+
+def pack(codes):
+    # 2 bits per cell, 4 cells per byte. The width of codes must be a multiple of 4.
+    quads = codes.astype(np.uint8).reshape(codes.shape[0], -1, 4)
+    return quads[..., 0] | quads[..., 1] << 2 | quads[..., 2] << 4 | quads[..., 3] << 6
+
+
+def unpack(packed):
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    return ((packed[..., None] >> shifts) & 3).reshape(packed.shape[0], -1)
+
+
+class NumpyBoard:
+    """
+    Domino shuffling state held as whole arrays rather than per-cell dicts.
+    occupied marks cells covered by a domino, direction holds the direction code
+    of that domino and ids its id. Every phase works on the full board at once.
+    """
+
+    def __init__(self, size=0):
+        self.occupied = np.zeros((size, size), dtype=bool)
+        self.direction = np.zeros((size, size), dtype=np.int8)
+        self.ids = np.zeros((size, size), dtype=np.int64)
+
+    @property
+    def size(self):
+        return self.occupied.shape[0]
+
+    def expand(self):
+        self.occupied = np.pad(self.occupied, 1)
+        self.direction = np.pad(self.direction, 1)
+        self.ids = np.pad(self.ids, 1)
+
+    def anchors(self):
+        # The top left cell of each domino, the first one a row major scan meets.
+        ids = np.where(self.occupied, self.ids, -1)
+        horizontal = self.direction <= DOWN
+        same_right = neighbour(ids, 0, 1, -1) == ids
+        same_below = neighbour(ids, 1, 0, -1) == ids
+        return self.occupied & np.where(horizontal, same_right, same_below)
+
+    def annihilate(self):
+        """
+        Remove every 2x2 block of dominoes pointing into each other.
+        Returns the (x, y) indices of the top left cell of each removed block in row major order,
+        alongside the ids of the dominoes removed (first the top/left one, then its partner).
+        """
+        anchors = self.anchors()
+        facing_down = anchors & (self.direction == DOWN) & (neighbour(self.direction, 1, 0, -1) == UP) & neighbour(self.occupied, 1, 0, False)
+        facing_right = anchors & (self.direction == RIGHT) & (neighbour(self.direction, 0, 1, -1) == LEFT) & neighbour(self.occupied, 0, 1, False)
+        xs, ys = np.nonzero(facing_down | facing_right)
+        down = facing_down[xs, ys].astype(int)
+        first = self.ids[xs, ys]
+        second = self.ids[xs + down, ys + 1 - down]
+        for dx in range(2):
+            for dy in range(2):
+                self.occupied[xs + dx, ys + dy] = False
+        return xs, ys, first, second
+
+    def slide(self):
+        """
+        Move every domino one cell in its direction.
+        Returns the ids and direction codes of the moved dominoes, in row major order of their anchors.
+        """
+        anchors = self.anchors()
+        moved_ids = self.ids[anchors]
+        moved_directions = self.direction[anchors]
+        xs, ys = np.nonzero(self.occupied)
+        codes = self.direction[xs, ys]
+        nx = xs + DIRECTION_VECTORS[codes, 0]
+        ny = ys + DIRECTION_VECTORS[codes, 1]
+        occupied = np.zeros_like(self.occupied)
+        direction = np.zeros_like(self.direction)
+        ids = np.zeros_like(self.ids)
+        occupied[nx, ny] = True
+        direction[nx, ny] = codes
+        ids[nx, ny] = self.ids[xs, ys]
+        self.occupied, self.direction, self.ids = occupied, direction, ids
+        return moved_ids, moved_directions
+
+    def empty_blocks(self):
+        # The (x, y) indices of the top left cell of every empty 2x2 block, in row major order.
+        half = self.size // 2
+        return np.nonzero(block_corners(diamond(self.size) & ~self.occupied, -half, -half, half))
+
+    def fill(self, xs, ys, up_down, first_id):
+        """
+        Place two dominoes in each block given by empty_blocks.
+        up_down selects a vertical pair of up/down dominoes, otherwise a left/right pair.
+        The block at index i receives ids first_id + 2i and first_id + 2i + 1.
+        """
+        up_down = np.asarray(up_down, dtype=bool)
+        first = first_id + 2 * np.arange(len(xs))
+        for dx, dy in BLOCK_CELLS:
+            self.occupied[xs + dx, ys + dy] = True
+            self.direction[xs + dx, ys + dy] = block_codes(up_down, dx, dy)
+            self.ids[xs + dx, ys + dy] = first + np.where(up_down, dx, dy)
+        return first
+
+
+def step_band(cells, r0, r1, c0, n, order, flip, carry_fill=None):
+    """
+    One band of PackedBoard.step, growing the diamond to order. cells holds the old direction codes
+    (-1 outside the old diamond) of buffer rows [r0-3, r1+2), starting at buffer column c0.
+    flip(xs, ys) decides each new block from its top left cell relative to the centre.
+    Returns the new codes of rows [r0, r1+1), where the last row only holds the bottom halves of
+    blocks starting in row r1-1. Those blocks belong to this band, so the next band is either handed
+    that row as carry_fill, or (carry_fill None) works out the blocks of its row r0-1 again.
+    That needs flip to be position addressable, but lets bands run independently.
+    """
+    # Remove any existing opposite arrows
+    facing = np.zeros(cells.shape, dtype=bool)
+    for code, (dx, dy) in enumerate(DIRECTIONS):
+        facing |= (cells == code) & (neighbour(cells, dx, dy, -1) == OPPOSITE[code])
+    cells = np.where(facing, -1, cells)
+    # Move the remaining arrows, giving rows [r0-1, r1).
+    slid = np.full(cells.shape, -1, dtype=np.int8)
+    for code, (dx, dy) in enumerate(DIRECTIONS):
+        slid[neighbour(cells, -dx, -dy, -1) == code] = code
+    slid = slid[2:-2]
+    # Generate new arrows
+    rows = np.abs(np.arange(r0 - 1, r1) + 0.5 - n)
+    columns = np.abs(np.arange(c0, c0 + cells.shape[1]) + 0.5 - n)
+    empty = (slid == -1) & (rows[:, None] + columns[None, :] <= order)
+    corners = block_corners(empty, r0 - 1 - n, c0 - n, order)
+    if carry_fill is not None:
+        corners[0] = False
+    xs, ys = np.nonzero(corners)
+    up_down = np.asarray(flip(xs + r0 - 1 - n, ys + c0 - n), dtype=bool)
+    filled = np.concatenate([slid, np.full((1, cells.shape[1]), -1, dtype=np.int8)])
+    if carry_fill is not None:
+        filled[1] = np.where(carry_fill >= 0, carry_fill, filled[1])
+    for dx, dy in BLOCK_CELLS:
+        filled[xs + dx, ys + dy] = block_codes(up_down, dx, dy)
+    return filled[1:]
+
+
+class PackedBoard:
+    """
+    Final tiling only board for very large orders, storing just the direction code of each cell in 2 bits.
+    The buffer is fixed at 2n x 2n with the diamond centred in it, and each step is worked through in bands
+    of band_rows rows so temporaries stay small. Cells outside the current diamond carry no meaning.
+    No dominoes are tracked, as once the board is a tiling the phases only need each cell's direction:
+    opposing pairs face each other cell by cell, and sliding moves cells independently.
+    """
+
+    def __init__(self, n, band_rows=256, wave_bands=16):
+        self.n = n
+        self.order = 0
+        self.band_rows = band_rows
+        self.wave_bands = wave_bands
+        self.width = -(-2 * n // 4) * 4
+        self.packed = np.zeros((2 * n, self.width // 4), dtype=np.uint8)
+
+    def mask(self, r0, r1, c0, c1, order=None):
+        # Cells of rows [r0, r1) and columns [c0, c1) inside the diamond.
+        order = self.order if order is None else order
+        rows = np.abs(np.arange(r0, r1) + 0.5 - self.n)
+        cols = np.abs(np.arange(c0, c1) + 0.5 - self.n)
+        return rows[:, None] + cols[None, :] <= order
+
+    def codes(self, r0=0, r1=None, c0=0, c1=None, order=None):
+        """
+        Unpacked direction codes of rows [r0, r1) and columns [c0, c1), with -1 outside the diamond.
+        c0 and c1 must be multiples of 4. Rows outside the buffer are allowed, and are all -1.
+        """
+        r1 = 2 * self.n if r1 is None else r1
+        c1 = self.width if c1 is None else c1
+        result = np.full((r1 - r0, c1 - c0), -1, dtype=np.int8)
+        lo, hi = max(r0, 0), min(r1, 2 * self.n)
+        if hi > lo:
+            result[lo - r0:hi - r0] = unpack(self.packed[lo:hi, c0 // 4:c1 // 4])
+        return np.where(self.mask(r0, r1, c0, c1, order), result, -1)
+
+    def step(self, flip, pool=None):
+        """
+        Advance the tiling by one order, in place. flip(xs, ys) returns whether each new block,
+        given by its top left cell relative to the centre, is an Up/Down pair.
+        Without a pool, bands run in order and blocks are passed to flip in row major order.
+        With a pool (anything with an executor style map) bands are spread across it wave_bands at a time,
+        which needs flip to be picklable and position addressable (see rng.CounterRNG).
+        """
+        old = self.order
+        self.order += 1
+        top, bottom = self.n - self.order, self.n + self.order
+        c0 = top // 4 * 4
+        c1 = min(-(-bottom // 4) * 4, self.width)
+        bands = [(r0, min(r0 + self.band_rows, bottom)) for r0 in range(top, bottom, self.band_rows)]
+        # Old rows just above the next band, which have already been overwritten.
+        halo = np.full((3, c1 - c0), -1, dtype=np.int8)
+        if pool is None:
+            carry_fill = np.full(c1 - c0, -1, dtype=np.int8)
+            for r0, r1 in bands:
+                cells = np.concatenate([halo, self.codes(r0, r1 + 2, c0, c1, old)])
+                halo = cells[-5:-2].copy()
+                filled = step_band(cells, r0, r1, c0, self.n, self.order, flip, carry_fill)
+                carry_fill = filled[-1]
+                self.packed[r0:r1, c0 // 4:c1 // 4] = pack(np.maximum(filled[:-1], 0))
+            return
+        for w in range(0, len(bands), self.wave_bands):
+            wave_bands = bands[w:w + self.wave_bands]
+            start, end = wave_bands[0][0], wave_bands[-1][1]
+            # Old rows [start-3, end+2).
+            cells = np.concatenate([halo, self.codes(start, end + 2, c0, c1, old)])
+            inputs = [cells[r0 - start:r1 - start + 5] for r0, r1 in wave_bands]
+            halo = cells[end - start:end - start + 3].copy()
+            results = pool.map(
+                step_band, inputs,
+                *zip(*((r0, r1, c0, self.n, self.order, flip) for r0, r1 in wave_bands)),
+            )
+            for (r0, r1), filled in zip(wave_bands, results):
+                self.packed[r0:r1, c0 // 4:c1 // 4] = pack(np.maximum(filled[:-1], 0))
@@ -1,27 +1,47 @@
+import json, os
 from manim.animation.fading import FadeIn, FadeInFrom
 from manim.utils.rate_functions import linear
 from animation import SquareDanceAnimator
+from cache import GenerationCache
 from generation import AztecGenerator
 
 class VideoAnimation(SquareDanceAnimator):
 
+    # Fix the seed to re-render the same tilings. Runs with a fixed seed are cached, so re-renders skip generation.
+    SEED = None
+    GENERATION_CACHE = GenerationCache(".generation_cache")
+    SECTIONS = ["slow", "fast", "super_fast"]
+    SECTION_ITERATIONS = {"slow": 10, "fast": 30, "super_fast": 60}
+
     def construct(self):
         self.renderer.camera.background_color = self.background_color
         self.renderer.camera.init_background()
 
-        self.slow()
-        self.fast()
-        self.super_fast()
+        # render_parallel.py renders a single section, or a range of its iterations, per scene by
+        # setting VIDEO_JOB to [section, seed, start, stop].
+        job = os.environ.get("VIDEO_JOB")
+        if job:
+            section, seed, start, stop = json.loads(job)
+            getattr(self, section + "_config", lambda: None)()
+            self.run_section(section, seed, start, stop)
+            return
+        for section in self.SECTIONS:
+            getattr(self, section + "_config", lambda: None)()
+            self.run_section(section, self.SEED, 0, self.SECTION_ITERATIONS[section])
 
-    def slow(self):
+    def run_section(self, section, seed, start, stop):
         a = AztecGenerator()
-        a.generate(n=10)
-        self.from_obj(a.obj)
-        self.wait(1)
+        # A run under a random seed can never be asked for again, so only fixed seeds are cached.
+        if seed is not None:
+            a.CACHE = self.GENERATION_CACHE
+        final = stop == self.SECTION_ITERATIONS[section]
+        self.from_obj(a.iter_generate(seed=seed, n=stop), start=start, final=final)
+        if final:
+            self.wait(1)
         self.reset()
 
-    def fast(self):
-        ITERATIONS = 30
+    def fast_config(self):
+        ITERATIONS = self.SECTION_ITERATIONS["fast"]
 
         self.ANIMATION_STEPS = [["RESIZE", "EXPAND", "REMOVE", "MOVE", "CREATE"]]
         self.ARROW_CREATE_ANIM = FadeIn
@@ -33,15 +53,11 @@ class VideoAnimation(SquareDanceAnimator):
         self.ITERATION_WAIT = 0
         self.SPEED = lambda i: 2 / pow((ITERATIONS - i) * 0.8 / ITERATIONS, 2)
 
-        a = AztecGenerator()
-        a.generate(n=ITERATIONS)
-        self.from_obj(a.obj)
-        self.wait(1)
-        self.reset()
-
-    def super_fast(self):
-        ITERATIONS = 60
+    def super_fast_config(self):
+        ITERATIONS = self.SECTION_ITERATIONS["super_fast"]
 
+        # Builds on the fast settings.
+        self.fast_config()
         self.ANIMATION_STEPS = [["RESIZE", "EXPAND", "REMOVE", "MOVE", "CREATE"]]
         self.SQUARE_CREATE_ANIM = None
         self.ARROW_BG_KWARGS = self.ARROW_FINAL_BG_KWARGS
@@ -54,10 +70,5 @@ class VideoAnimation(SquareDanceAnimator):
         self.DESTRUCTION_OVERLAY_COLOUR = None
         self.DESTRUCTION_ARROW_ANIM = None
         self.ITERATION_WAIT = 0
+        self.BATCH_ARROWS = True
         self.SPEED = lambda i: 4 / pow((ITERATIONS - i) * 0.9 / ITERATIONS, 3)
-
-        a = AztecGenerator()
-        a.generate(n=ITERATIONS)
-        self.from_obj(a.obj)
-        self.wait(1)
-        self.reset()